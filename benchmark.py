@@ -0,0 +1,462 @@
+"""Benchmark offline da Pokedex: um servidor HTTP local faz o papel da PokeAPI e dos sprites.
+
+Uso:
+    python benchmark.py                               # fixtures sintéticos, 40 ms de latência
+    python benchmark.py --latency 0.08 --jitter 0.03
+    python benchmark.py --save-baseline baseline.json
+    python benchmark.py --compare baseline.json
+    python benchmark.py --record fixtures --count 30  # grava fixtures reais da PokeAPI
+    python benchmark.py --fixtures fixtures
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import urlsplit
+
+REAL_API_BASE = "https://pokeapi.co/api/v2"
+REAL_SPRITES_BASE = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+API_PLACEHOLDER = "{{API_BASE}}"
+SPRITES_PLACEHOLDER = "{{SPRITES_BASE}}"
+API_PATH = "/api/v2"
+SPRITES_PATH = "/sprites"
+ARTWORK_BOX = (432, 432)
+SCALING = 1.0
+GRID_WORKERS = 6
+SYLLABLES = ["bul", "ba", "char", "man", "der", "squir", "tle", "pi", "ka", "chu", "ee", "vee",
+             "mew", "tar", "sa", "ur", "gen", "gar", "on", "ix", "dra", "ti", "ni", "lap"]
+VERSIONS = ["red", "blue", "gold", "silver", "ruby", "sapphire"]
+
+def fixture_key(url):
+    """Caminho no servidor local para uma URL da PokeAPI ou do repositório de sprites."""
+    url = url.replace(REAL_API_BASE, API_PLACEHOLDER).replace(REAL_SPRITES_BASE, SPRITES_PLACEHOLDER)
+    url = url.replace(API_PLACEHOLDER, API_PATH).replace(SPRITES_PLACEHOLDER, SPRITES_PATH)
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") or "/"
+    return f"{path}?{parts.query}" if parts.query else path
+
+class Fixtures:
+    """Respostas servidas pelo servidor local, por caminho; JSON guarda as URLs com marcadores de base."""
+    def __init__(self):
+        self.responses = {}
+        self.names = []
+
+    def add_json(self, key, payload):
+        self.responses[key] = ("application/json", json.dumps(payload).encode("utf-8"))
+
+    def add_binary(self, key, content_type, body):
+        self.responses[key] = (content_type, body)
+
+    def render(self, key, api_base, sprites_base):
+        entry = self.responses.get(key)
+        if entry is None: return None
+        content_type, body = entry
+        if content_type == "application/json":
+            body = body.replace(API_PLACEHOLDER.encode(), api_base.encode()).replace(SPRITES_PLACEHOLDER.encode(), sprites_base.encode())
+        return content_type, body
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        index = {}
+        for i, (key, (content_type, body)) in enumerate(sorted(self.responses.items())):
+            filename = f"{i:05d}.{'json' if content_type == 'application/json' else content_type.split('/')[-1]}"
+            with open(os.path.join(directory, filename), "wb") as f:
+                f.write(body)
+            index[key] = {'file': filename, 'content_type': content_type}
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({'names': self.names, 'responses': index}, f, indent=1)
+
+    @classmethod
+    def load(cls, directory):
+        fixtures = cls()
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        fixtures.names = index['names']
+        for key, entry in index['responses'].items():
+            with open(os.path.join(directory, entry['file']), "rb") as f:
+                fixtures.responses[key] = (entry['content_type'], f.read())
+        return fixtures
+
+def _encode_image(image, fmt, **kwargs):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+def synthetic_fixtures(count, seed=0):
+    """Gera fixtures com o formato da PokeAPI: Pokémon em cadeias de três, com sprite, artwork e GIF animado."""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    fixtures = Fixtures()
+    sprite = _encode_image(Image.effect_noise((96, 96), 64).convert("RGBA"), "PNG")
+    shiny_sprite = _encode_image(Image.effect_noise((96, 96), 96).convert("RGBA"), "PNG")
+    artwork = _encode_image(Image.effect_noise((475, 475), 64).convert("RGBA"), "PNG")
+    gif_frames = [Image.effect_noise((64, 64), 32 + 8 * i).convert("P") for i in range(8)]
+    gif = _encode_image(gif_frames[0], "GIF", save_all=True, append_images=gif_frames[1:], duration=80, loop=0)
+
+    used = set()
+    for poke_id in range(1, count + 1):
+        name = "".join(rng.sample(SYLLABLES, 2))
+        while name in used: name += rng.choice(SYLLABLES)
+        used.add(name)
+        fixtures.names.append(name)
+
+    api, sprites = API_PLACEHOLDER, SPRITES_PLACEHOLDER
+    for poke_id, name in enumerate(fixtures.names, start=1):
+        chain_id = (poke_id - 1) // 3 + 1
+        fixtures.add_json(fixture_key(f"{api}/pokemon/{name}"), {
+            'id': poke_id, 'name': name,
+            'types': [{'slot': 1, 'type': {'name': rng.choice(["fire", "water", "grass", "electric"])}}],
+            'stats': [{'base_stat': rng.randint(20, 150), 'stat': {'name': stat}}
+                      for stat in ("hp", "attack", "defense", "special-attack", "special-defense", "speed")],
+            'species': {'name': name, 'url': f"{api}/pokemon-species/{poke_id}/"},
+            'location_area_encounters': f"{api}/pokemon/{poke_id}/encounters",
+            'sprites': {
+                'front_default': f"{sprites}/{poke_id}.png",
+                'front_shiny': f"{sprites}/shiny/{poke_id}.png",
+                'other': {'official-artwork': {'front_default': f"{sprites}/other/official-artwork/{poke_id}.png",
+                                               'front_shiny': f"{sprites}/other/official-artwork/shiny/{poke_id}.png"}},
+                'versions': {'generation-v': {'black-white': {'animated': {
+                    'front_default': f"{sprites}/versions/generation-v/black-white/animated/{poke_id}.gif",
+                    'front_shiny': f"{sprites}/versions/generation-v/black-white/animated/shiny/{poke_id}.gif"}}}},
+            },
+        })
+        fixtures.add_json(fixture_key(f"{api}/pokemon-species/{poke_id}/"), {
+            'id': poke_id, 'name': name,
+            'names': [{'name': name.title(), 'language': {'name': 'en'}}],
+            'flavor_text_entries': [{'flavor_text': f"Descrição sintética de {name}.", 'language': {'name': 'pt'}}],
+            'evolution_chain': {'url': f"{api}/evolution-chain/{chain_id}/"},
+        })
+        fixtures.add_json(fixture_key(f"{api}/pokemon/{poke_id}/encounters"), [
+            {'location_area': {'name': f"route-{rng.randint(1, 30)}-area"},
+             'version_details': [{'version': {'name': version}} for version in rng.sample(VERSIONS, 2)]}
+            for _ in range(rng.randint(0, 4))
+        ])
+        fixtures.add_binary(fixture_key(f"{sprites}/{poke_id}.png"), "image/png", sprite)
+        fixtures.add_binary(fixture_key(f"{sprites}/shiny/{poke_id}.png"), "image/png", shiny_sprite)
+        fixtures.add_binary(fixture_key(f"{sprites}/other/official-artwork/{poke_id}.png"), "image/png", artwork)
+        fixtures.add_binary(fixture_key(f"{sprites}/other/official-artwork/shiny/{poke_id}.png"), "image/png", artwork)
+        fixtures.add_binary(fixture_key(f"{sprites}/versions/generation-v/black-white/animated/{poke_id}.gif"), "image/gif", gif)
+        fixtures.add_binary(fixture_key(f"{sprites}/versions/generation-v/black-white/animated/shiny/{poke_id}.gif"), "image/gif", gif)
+
+    for chain_start in range(1, count + 1, 3):
+        members = list(range(chain_start, min(chain_start + 3, count + 1)))
+        node = None
+        for member in reversed(members):
+            node = {'species': {'name': fixtures.names[member - 1], 'url': f"{api}/pokemon-species/{member}/"},
+                    'evolves_to': [node] if node else []}
+        fixtures.add_json(fixture_key(f"{api}/evolution-chain/{(chain_start - 1) // 3 + 1}/"), {'chain': node})
+
+    fixtures.add_json(fixture_key(f"{api}/pokemon?limit=100000"), {
+        'count': count,
+        'results': [{'name': name, 'url': f"{api}/pokemon/{poke_id}/"} for poke_id, name in enumerate(fixtures.names, start=1)],
+    })
+    return fixtures
+
+def record_fixtures(directory, count):
+    """Grava respostas reais da PokeAPI (os primeiros count Pokémon) para servir depois sem rede."""
+    import requests
+
+    session = requests.Session()
+    fixtures = Fixtures()
+
+    def fetch(url, binary=False):
+        key = fixture_key(url)
+        if key in fixtures.responses: return None
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        if binary:
+            fixtures.add_binary(key, response.headers.get('Content-Type', 'application/octet-stream'), response.content)
+            return None
+        body = response.text.replace(REAL_API_BASE, API_PLACEHOLDER).replace(REAL_SPRITES_BASE, SPRITES_PLACEHOLDER)
+        fixtures.responses[key] = ("application/json", body.encode("utf-8"))
+        return response.json()
+
+    catalog = fetch(f"{REAL_API_BASE}/pokemon?limit={count}")
+    for entry in catalog['results']:
+        name = entry['name']
+        print(f"Gravando {name}...")
+        fixtures.names.append(name)
+        pokemon = fetch(f"{REAL_API_BASE}/pokemon/{name}")
+        species = fetch(pokemon['species']['url'])
+        fetch(pokemon['location_area_encounters'])
+        if species: fetch(species['evolution_chain']['url'])
+        fetch(f"{REAL_SPRITES_BASE}/{pokemon['id']}.png", binary=True)
+        sprites = pokemon['sprites']
+        for key in ('front_default', 'front_shiny'):
+            for url in (sprites.get(key), sprites.get('other', {}).get('official-artwork', {}).get(key),
+                        sprites.get('versions', {}).get('generation-v', {}).get('black-white', {}).get('animated', {}).get(key)):
+                if url: fetch(url, binary=True)
+    # O catálogo gravado precisa ter a mesma URL que a aplicação pede.
+    fixtures.responses[fixture_key(f"{REAL_API_BASE}/pokemon?limit=100000")] = fixtures.responses.pop(fixture_key(f"{REAL_API_BASE}/pokemon?limit={count}"))
+    fixtures.save(directory)
+    print(f"{len(fixtures.responses)} respostas gravadas em {directory}")
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer que não imprime traceback quando o cliente desiste no meio (downloads cancelados)."""
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError): return
+        super().handle_error(request, client_address)
+
+class FixtureServer:
+    """Servidor HTTP local que imita a PokeAPI e o repositório de sprites, com latência e variação configuráveis."""
+    def __init__(self, fixtures, latency, jitter, seed=0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalhos e corpo saem em escritas separadas; com Nagle + ACK atrasado, cada requisição numa
+            # conexão reaproveitada esperaria ~40 ms a mais do que a latência configurada.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server._delay()
+                rendered = server.fixtures.render(fixture_key(self.path), server.api_base, server.sprites_base)
+                if rendered is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content_type, body = rendered
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        host, port = self.httpd.server_address
+        self.api_base = f"http://{host}:{port}{API_PATH}"
+        self.sprites_base = f"http://{host}:{port}{SPRITES_PATH}"
+
+    def _delay(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0: time.sleep(delay)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="benchmark-server", daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def rss_mb():
+    """Memória residente atual do processo em MB, quando o sistema permite medir."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+class HeadlessPokedex:
+    """Os mesmos passos da interface (busca, imagem, pré-carregamento, grade) sobre um PokedexService, sem janela."""
+    def __init__(self, pokedex, cache_dir, names):
+        self.pokedex = pokedex
+        self.service = pokedex.PokedexService(cache_dir)
+        self.service.set_catalog([pokedex.catalog_entry(i, name) for i, name in enumerate(names, start=1)])
+        self.sprite_pool = pokedex.PriorityWorkerPool(GRID_WORKERS, name="benchmark-sprite")
+        self.search_id = 0
+        self.token = pokedex.CancelToken()
+
+    def _start_search(self):
+        self.token.cancel()
+        self.search_id += 1
+        self.token = self.pokedex.CancelToken()
+        return self.search_id, self.token
+
+    def show_detail(self, name):
+        """Busca os detalhes e a imagem; retorna o resultado e o tempo (ms) até a imagem poder ser exibida."""
+        started = time.perf_counter()
+        search_id, token = self._start_search()
+        result = self.service.lookup(name, search_id, token)
+        if result is None or result['status'] != 'success': raise RuntimeError(f"busca de {name} falhou")
+        return result, self._show_image(result['data'], False, started)
+
+    def toggle_image(self, data, shiny):
+        return self._show_image(data, shiny, time.perf_counter())
+
+    def _show_image(self, data, shiny, started):
+        search_id, token = self._start_search()
+        ready = []
+        sources = self.pokedex.image_sources(data.get('sprites', {}), shiny)
+        self.service.load_detail_image(sources, ARTWORK_BOX, SCALING, token, search_id,
+                                       on_ready=lambda prepared: ready.append(time.perf_counter()))
+        if not ready: raise RuntimeError("nenhuma fonte de imagem pôde ser carregada")
+        return (ready[0] - started) * 1000
+
+    def schedule_prefetch(self, result):
+        data = result['data']
+        self.service.schedule_prefetch(data['id'], result['evolution_chain'], data['name'], ARTWORK_BOX, SCALING)
+
+    def populate_grid(self, entries):
+        """Carrega os sprites de uma página da grade com a mesma prioridade da interface; retorna ms até o último."""
+        remaining = [len(entries)]
+        done = threading.Event()
+        lock = threading.Lock()
+
+        def load(url):
+            try:
+                self.service.image_cache.get(url)
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0: done.set()
+
+        started = time.perf_counter()
+        for index, entry in enumerate(entries):
+            self.sprite_pool.submit(index, load, self.pokedex.grid_sprite_url(entry['id']))
+        if entries: done.wait()
+        return (time.perf_counter() - started) * 1000
+
+def run_scenarios(pokedex, names, args, workdir):
+    """Executa os cenários e retorna {cenário: {amostras, p50, p95, threads, rss}}."""
+    samples = {}
+    snapshots = {}
+
+    def finish(scenario, values):
+        samples[scenario] = values
+        snapshots[scenario] = {'threads': threading.active_count(), 'rss_mb': rss_mb()}
+        print(f"  {scenario}: {len(values)} amostras")
+
+    detail_names = names[:args.iterations]
+    cold_dir = os.path.join(workdir, "detail")
+    cold = HeadlessPokedex(pokedex, cold_dir, names)
+    finish('cold_detail', [cold.show_detail(name)[1] for name in detail_names])
+    finish('memory_warm_detail', [cold.show_detail(name)[1] for name in detail_names])
+    # Nova instância sobre o mesmo diretório: equivale a reabrir o programa com o cache em disco populado.
+    warm = HeadlessPokedex(pokedex, cold_dir, names)
+    finish('disk_warm_detail', [warm.show_detail(name)[1] for name in detail_names])
+
+    grid = HeadlessPokedex(pokedex, os.path.join(workdir, "grid"), names)
+    matches = grid.service.search(args.grid_term)
+    pages = [matches[i:i + args.grid_page] for i in range(0, len(matches), args.grid_page)][:args.iterations]
+    finish('grid_population', [grid.populate_grid(page) for page in pages])
+
+    browser = HeadlessPokedex(pokedex, os.path.join(workdir, "browse"), names)
+    steps = list(range(min(args.iterations, len(names))))
+    browse_times = []
+    results = {}
+    for index in steps + steps[-2::-1]:
+        result, elapsed = browser.show_detail(names[index])
+        results[index] = result
+        browse_times.append(elapsed)
+        browser.schedule_prefetch(result)
+        time.sleep(args.think)
+    finish('next_prev_browse', browse_times)
+
+    toggles = []
+    for index in steps:
+        data = results[index]['data']
+        toggles.append(browser.toggle_image(data, True))
+        toggles.append(browser.toggle_image(data, False))
+    finish('shiny_toggle', toggles)
+
+    return {scenario: {'samples': len(values), 'p50_ms': pokedex.percentile(values, 0.5), 'p95_ms': pokedex.percentile(values, 0.95),
+                       **snapshots[scenario]}
+            for scenario, values in samples.items()}
+
+def print_report(report):
+    print(f"\n{'cenário':<22}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'threads':>9}{'RSS MB':>9}")
+    for scenario, row in report['scenarios'].items():
+        rss = f"{row['rss_mb']:.0f}" if row['rss_mb'] is not None else "-"
+        print(f"{scenario:<22}{row['samples']:>5}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['threads']:>9}{rss:>9}")
+    print(f"requisições ao servidor: {report['server_requests']}")
+
+def compare(report, baseline, tolerance):
+    """Compara com a linha de base; retorna os cenários que pioraram além da tolerância."""
+    regressions = []
+    print(f"\n{'cenário':<22}{'p50 base':>10}{'p50 agora':>11}{'p95 base':>10}{'p95 agora':>11}")
+    for scenario, row in report['scenarios'].items():
+        base = baseline['scenarios'].get(scenario)
+        if not base:
+            print(f"{scenario:<22}{'(novo)':>10}")
+            continue
+        flags = [metric for metric in ('p50_ms', 'p95_ms') if row[metric] > base[metric] * (1 + tolerance)]
+        print(f"{scenario:<22}{base['p50_ms']:>10.1f}{row['p50_ms']:>11.1f}{base['p95_ms']:>10.1f}{row['p95_ms']:>11.1f}"
+              + ("  PIOROU" if flags else ""))
+        if flags: regressions.append(scenario)
+    if baseline.get('config') != report['config']:
+        print("Atenção: a linha de base foi gerada com outra configuração.")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline da Pokedex com uma PokeAPI local")
+    parser.add_argument("--fixtures", help="diretório de fixtures gravados (padrão: sintéticos)")
+    parser.add_argument("--record", metavar="DIR", help="grava fixtures reais da PokeAPI em DIR e sai")
+    parser.add_argument("--count", type=int, default=60, help="quantidade de Pokémon dos fixtures (padrão: 60)")
+    parser.add_argument("--latency", type=float, default=0.04, help="latência por requisição em segundos (padrão: 0.04)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="variação máxima da latência em segundos (padrão: 0.01)")
+    parser.add_argument("--iterations", type=int, default=12, help="amostras por cenário (padrão: 12)")
+    parser.add_argument("--grid-term", default="a", help="termo amplo para a grade (padrão: a)")
+    parser.add_argument("--grid-page", type=int, default=24, help="cards visíveis por página da grade (padrão: 24)")
+    parser.add_argument("--think", type=float, default=0.2, help="pausa entre passos da navegação, em segundos (padrão: 0.2)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="grava o resultado como linha de base")
+    parser.add_argument("--compare", metavar="FILE", help="compara com uma linha de base gravada")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="piora relativa aceita na comparação (padrão: 0.10)")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, args.count)
+        return 0
+
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else synthetic_fixtures(args.count)
+    server = FixtureServer(fixtures, args.latency, args.jitter)
+    server.start()
+    # As URLs base são lidas na importação do serviço, então precisam estar definidas antes dela.
+    os.environ["POKEDEX_API_BASE"] = server.api_base
+    os.environ["POKEDEX_SPRITES_BASE"] = server.sprites_base
+    import pokedex_service as pokedex
+
+    workdir = tempfile.mkdtemp(prefix="pokedex-bench-")
+    try:
+        print(f"Servidor local em {server.api_base} ({len(fixtures.names)} Pokémon, latência {args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms)")
+        report = {
+            'config': {'fixtures': args.fixtures or f"sintéticos:{args.count}", 'latency': args.latency, 'jitter': args.jitter,
+                       'iterations': args.iterations, 'grid_term': args.grid_term, 'grid_page': args.grid_page, 'think': args.think},
+            'scenarios': run_scenarios(pokedex, fixtures.names, args, workdir),
+            'server_requests': server.requests,
+        }
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Linha de base gravada em {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"Cenários que pioraram: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
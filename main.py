@@ -1,12 +1,38 @@
 import customtkinter as ctk
 import requests
 import threading
-from PIL import Image, ImageSequence, UnidentifiedImageError
-from io import BytesIO
+from collections import OrderedDict
+from PIL import Image, UnidentifiedImageError
 from functools import partial
 import pystray
 import sys
+import os
+import argparse
+import math
+import json
+import time
 from pynput import keyboard
+from pokedex_service import (
+    CACHE_DIR, BATCH_WORKERS, ANIMATION_CACHE_SIZE, PokedexService, PriorityWorkerPool, CancelToken, OperationCancelled, grid_sprite_url, image_sources,
+)
+
+SPRITE_WORKERS = 6
+IMAGE_WORKERS = 2
+ANIMATION_WAIT_MS = 30
+GRID_CARD_MIN_WIDTH = 150
+GRID_ROW_HEIGHT = 160
+GRID_OVERSCAN_ROWS = 1
+EVOLUTION_SPRITE_SIZE = 96
+EVOLUTION_CARD_WIDTH = 140
+EVOLUTION_COMPACT_SPRITE_SIZE = 48
+EVOLUTION_COMPACT_BRANCHES = 3
+EVOLUTION_COMPACT_COLUMNS = 4
+LIVE_SEARCH_DELAY_MS = 120
+FRAME_BUDGET_MS = 1000 / 60
+FONT_SCALE_STEP = 0.05
+POKEBALL_MIN_SIZE = 64
+POKEBALL_SIZE_STEP = 16
+TRACE_ENV_VAR = "POKEDEX_TRACE"
 
 TYPE_COLORS = {
     "normal": "#A8A77A", "fire": "#EE8130", "water": "#6390F0", "electric": "#F7D02C",
@@ -29,6 +55,196 @@ TYPE_TRANSLATIONS = {
     "steel": "Aço", "fairy": "Fada"
 }
 
+def image_pyramid(image, min_size):
+    """Versões pré-reduzidas de uma imagem (metade do lado a cada nível), da menor para a original."""
+    levels = [image]
+    while min(levels[-1].size) // 2 >= min_size:
+        width, height = levels[-1].size
+        levels.append(levels[-1].resize((width // 2, height // 2), Image.Resampling.LANCZOS))
+    return levels[::-1]
+
+class LocationSection(ctk.CTkFrame):
+    """Seção recolhível de uma versão no painel de locais: só o cabeçalho é criado de início e, ao expandir,
+    todas as áreas entram num único rótulo, então o custo não cresce com o número de encontros.
+    As seções são reaproveitadas entre Pokémon via set()."""
+    def __init__(self, master, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.version = ""
+        self.areas = []
+        self.header_font = None
+        self.body_font = None
+        self.expanded = False
+        self.body = None
+        self.header = ctk.CTkButton(self, text="", anchor="w", fg_color="transparent",
+                                    hover_color="gray25", text_color=("gray10", "gray90"), command=self.toggle)
+        self.header.pack(fill="x")
+
+    def set(self, version, areas, header_font, body_font, expanded=False):
+        """Passa a mostrar outra versão, sem recriar widgets."""
+        self.version = version
+        self.areas = areas
+        self.header_font = header_font
+        self.body_font = body_font
+        self.expanded = expanded
+        self._render()
+
+    def toggle(self):
+        self.expanded = not self.expanded
+        self._render()
+
+    def _render(self):
+        arrow = "▾" if self.expanded else "▸"
+        self.header.configure(text=f"{arrow} Pokémon {self.version} ({len(self.areas)})", font=self.header_font)
+        if not self.expanded:
+            if self.body is not None: self.body.pack_forget()
+            return
+        text = "\n".join(f"  • {area}" for area in self.areas)
+        if self.body is None:
+            self.body = ctk.CTkLabel(self, text=text, font=self.body_font, anchor="w", justify="left")
+        else:
+            self.body.configure(text=text, font=self.body_font)
+        self.body.pack(fill="x", padx=10)
+
+class VirtualCardGrid(ctk.CTkFrame):
+    """Grade virtualizada: mantém só os cards da área visível (mais uma margem) e os recicla na rolagem."""
+    def __init__(self, master, create_card, bind_card, **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_card = create_card
+        self.bind_card = bind_card
+        self.items = []
+        self.cols = 2
+        self.scroll_px = 0
+        self.focused_index = None
+        self.cards = []
+        self._bound = {}
+        self._card_size = None
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.body.bind("<Configure>", lambda event: self.refresh())
+        self.bind_all("<MouseWheel>", self._on_mouse_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_mouse_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_mouse_wheel, add="+")
+
+    def set_items(self, items):
+        """Troca os dados exibidos, voltando ao topo."""
+        self.items = items
+        self.scroll_px = 0
+        self.focused_index = 0 if items else None
+        self._bound.clear()
+        self.refresh()
+
+    def update_items(self, items):
+        """Troca os dados voltando ao topo, religando apenas os cards cujo item mudou."""
+        old_items, old_focus = self.items, self.focused_index
+        self.items = items
+        self.scroll_px = 0
+        self.focused_index = 0 if items else None
+        for card, index in list(self._bound.items()):
+            if index >= len(items) or items[index] is not old_items[index] or index in (old_focus, self.focused_index):
+                del self._bound[card]
+        self.refresh()
+
+    def is_bound(self, card, index, item=None):
+        """Indica se o card ainda exibe o item de índice informado."""
+        if self._bound.get(card) != index: return False
+        return item is None or (index < len(self.items) and self.items[index] is item)
+
+    def set_focus(self, index):
+        """Move o destaque de teclado, rolando para manter o card visível."""
+        if not self.items: return
+        old_index = self.focused_index
+        self.focused_index = max(0, min(len(self.items) - 1, index))
+        row_top = (self.focused_index // self.cols) * GRID_ROW_HEIGHT
+        view_height = self._view_size()[1]
+        if row_top < self.scroll_px:
+            self.scroll_px = row_top
+        elif row_top + GRID_ROW_HEIGHT > self.scroll_px + view_height:
+            self.scroll_px = row_top + GRID_ROW_HEIGHT - view_height
+        for card, bound_index in list(self._bound.items()):
+            if bound_index in (old_index, self.focused_index):
+                del self._bound[card]
+        self.refresh()
+
+    def _view_size(self):
+        # Posições do place() são dadas em unidades sem escala de DPI, como no resto do CustomTkinter.
+        scaling = self._get_widget_scaling()
+        return max(1, int(self.body.winfo_width() / scaling)), max(1, int(self.body.winfo_height() / scaling))
+
+    def refresh(self):
+        """Reposiciona os cards reciclados de acordo com o tamanho e a rolagem atuais."""
+        view_width, view_height = self._view_size()
+        cols = max(2, view_width // GRID_CARD_MIN_WIDTH)
+        if cols != self.cols:
+            self.cols = cols
+            self._bound.clear()
+
+        total_rows = math.ceil(len(self.items) / cols)
+        total_height = total_rows * GRID_ROW_HEIGHT
+        self.scroll_px = max(0, min(self.scroll_px, total_height - view_height))
+        pool_rows = math.ceil(view_height / GRID_ROW_HEIGHT) + GRID_OVERSCAN_ROWS
+        while len(self.cards) < pool_rows * cols:
+            card = self.create_card(self.body)
+            if self._card_size:
+                card.configure(width=self._card_size[0], height=self._card_size[1])
+            self.cards.append(card)
+            self._bound.clear()
+
+        cell_width = view_width / cols
+        card_size = (max(1, int(cell_width) - 10), GRID_ROW_HEIGHT - 10)
+        if card_size != self._card_size:
+            self._card_size = card_size
+            for card in self.cards:
+                card.configure(width=card_size[0], height=card_size[1])
+        first_row = self.scroll_px // GRID_ROW_HEIGHT
+        shown = set()
+        for row in range(first_row, min(first_row + pool_rows, total_rows)):
+            for col in range(cols):
+                index = row * cols + col
+                if index >= len(self.items): break
+                card = self.cards[index % len(self.cards)]
+                if self._bound.get(card) != index:
+                    self._bound[card] = index
+                    self.bind_card(card, index, self.items[index], index == self.focused_index)
+                card.place(x=int(col * cell_width) + 5, y=row * GRID_ROW_HEIGHT - self.scroll_px + 5)
+                shown.add(card)
+
+        for card in self.cards:
+            if card not in shown:
+                card.place_forget()
+                self._bound.pop(card, None)
+
+        if total_height > view_height:
+            self.scrollbar.set(self.scroll_px / total_height, (self.scroll_px + view_height) / total_height)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, scroll_px):
+        self.scroll_px = int(scroll_px)
+        self.refresh()
+
+    def _on_scrollbar(self, *args):
+        total_height = math.ceil(len(self.items) / self.cols) * GRID_ROW_HEIGHT
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * total_height)
+        elif args[0] == "scroll":
+            step = self._view_size()[1] if args[2] == "pages" else GRID_ROW_HEIGHT // 3
+            self.scroll_to(self.scroll_px + int(args[1]) * step)
+
+    def _on_mouse_wheel(self, event):
+        if not self.winfo_ismapped(): return
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(self)): return
+        if event.num == 4: direction = -1
+        elif event.num == 5: direction = 1
+        else: direction = -1 if event.delta > 0 else 1
+        self.scroll_to(self.scroll_px + direction * (GRID_ROW_HEIGHT // 3))
+
 class PokedexApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -52,25 +268,49 @@ class PokedexApp(ctk.CTk):
         ctk.set_default_color_theme("blue")
 
         self.font_family = "Oswald"
+        # As fontes são criadas uma única vez; o redimensionamento só altera o tamanho delas.
+        self.font_title = ctk.CTkFont(family="Oswald", weight="bold")
+        self.font_subtitle = ctk.CTkFont(family="Oswald", weight="bold")
+        self.font_body = ctk.CTkFont(family="Oswald")
+        self.font_button = ctk.CTkFont(family="Oswald", weight="bold")
+        self.font_small = ctk.CTkFont(family="Oswald")
+        self.font_icon = ctk.CTkFont()
+        self.font_home = ctk.CTkFont(family="Oswald", weight="bold")
+        self._scaled_fonts = [(self.font_title, 32), (self.font_subtitle, 22), (self.font_body, 16), (self.font_button, 14),
+                              (self.font_small, 12), (self.font_icon, 20), (self.font_home, 50)]
+        self._font_scale = None
         self.update_font_sizes()
 
         self.current_search_id = 0
         self.pokemon_image = None 
-        self.animation_frames = []
+        self.current_animation = None
+        # CTkImage dos quadros de cada animação; só a thread da interface cria e descarta imagens do Tk.
+        self.animation_frames = OrderedDict()
+        self._animation_job = None
+        self._animation_position = None
+        self.window_hidden = False
         self.all_pokemon_list = []
+        self.pokemon_index = None
         self.navigation_history = []
         self.history_index = -1
-        self.grid_cards = []
-        self.focused_card_index = None
+        self.search_token = CancelToken()
+        self.grid_token = CancelToken()
+        self.live_search_job = None
+        self.live_search_term = ""
+        self.live_search_matches = []
         self.current_pokedex_id = None
         self.current_pokemon_data = None
         self.show_shiny = False
         self.blank_image = ctk.CTkImage(light_image=Image.new("RGBA", (1, 1), (0,0,0,0)), size=(1,1))
-        self.api_cache = {}
-        self.image_cache = {}
+        self.service = PokedexService(CACHE_DIR)
+        self.sprite_pool = PriorityWorkerPool(SPRITE_WORKERS, name="pokedex-sprite")
+        self.image_pool = PriorityWorkerPool(IMAGE_WORKERS, name="pokedex-image")
+        self.offline_sync_thread = None
         self.hotkey_listener = None
         
         self.create_widgets()
+        catalog = self.service.load_cached_catalog()
+        if catalog: self.set_catalog(catalog)
         
         self.bind("<Escape>", self.handle_escape)
         self.bind("<Left>", self.prev_pokemon_event)
@@ -78,6 +318,7 @@ class PokedexApp(ctk.CTk):
         self.bind("<BackSpace>", self.handle_backspace_nav)
         
         self._resize_job = None
+        self._layout_size = None
         self.bind('<Configure>', self._on_resize_debounce)
         
         self.protocol("WM_DELETE_WINDOW", self.hide_window)
@@ -87,6 +328,7 @@ class PokedexApp(ctk.CTk):
         self.hotkey_thread.start()
         
         threading.Thread(target=self.load_all_pokemon_names, daemon=True).start()
+        threading.Thread(target=self.service.reindex_offline_store, daemon=True).start()
 
     def create_widgets(self):
         """Cria todos os widgets da interface."""
@@ -102,6 +344,7 @@ class PokedexApp(ctk.CTk):
         self.search_entry = ctk.CTkEntry(top_frame, placeholder_text="Digite o nome ou número do Pokémon...", height=40, font=self.font_body)
         self.search_entry.pack(side="left", expand=True, fill="x", padx=(0, 10))
         self.search_entry.bind("<Return>", self.search_pokemon_event)
+        self.search_entry.bind("<KeyRelease>", self.on_search_typed)
 
         search_icon = "🔍"
         self.search_button = ctk.CTkButton(top_frame, text=search_icon, height=40, width=40, command=self.search_pokemon_event, font=self.font_icon, fg_color="#B71C1C", hover_color="#D32F2F")
@@ -121,18 +364,21 @@ class PokedexApp(ctk.CTk):
         self.home_page = ctk.CTkFrame(self.main_container, fg_color="transparent")
         self.home_page.pack(fill="both", expand=True)
 
+        # A pokébola é reduzida a partir do nível da pirâmide mais próximo, e cada tamanho vira um CTkImage uma vez só.
+        self.pokeball_images = {}
+        self.home_image_size = None
         try:
-            self.pokeball_image_pil = Image.open("Group 23.png")
+            self.pokeball_pyramid = image_pyramid(Image.open("Group 23.png"), POKEBALL_MIN_SIZE)
             self.home_image_label = ctk.CTkLabel(self.home_page, text="")
             self.home_image_label.place(relx=0.5, rely=0.5, anchor="center")
         except FileNotFoundError:
-            self.pokeball_image_pil = None
-            self.home_image_label = ctk.CTkLabel(self.home_page, text="Pokedex")
+            self.pokeball_pyramid = None
+            self.home_image_label = ctk.CTkLabel(self.home_page, text="Pokedex", font=self.font_home)
             self.home_image_label.place(relx=0.5, rely=0.5, anchor="center")
 
-        self.search_results_page = ctk.CTkScrollableFrame(self.main_container, fg_color=("gray92", "gray17"))
-        self.search_results_grid = ctk.CTkFrame(self.search_results_page, fg_color="transparent")
-        self.search_results_grid.pack(fill="both", expand=True)
+        self.search_results_page = ctk.CTkFrame(self.main_container, fg_color=("gray92", "gray17"))
+        self.search_results_grid = VirtualCardGrid(self.search_results_page, self._create_result_card, self._bind_result_card, fg_color="transparent")
+        self.search_results_grid.pack(fill="both", expand=True, padx=5, pady=5)
 
         self.detail_page = ctk.CTkFrame(self.main_container, fg_color="transparent")
         self._create_detail_view_widgets()
@@ -143,6 +389,7 @@ class PokedexApp(ctk.CTk):
         self.loading_label = ctk.CTkLabel(self.loading_frame, text="A carregar...")
         self.loading_label.place(relx=0.5, rely=0.5, anchor="s", y=-10)
         
+        self.assign_fonts()
         self.after(100, self.update_responsive_layout)
 
     def _create_detail_view_widgets(self):
@@ -188,6 +435,11 @@ class PokedexApp(ctk.CTk):
         
         self.evolution_frame = ctk.CTkFrame(left_frame, fg_color="transparent")
         self.evolution_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 20))
+        # Colunas, cards e setas da cadeia evolutiva são reaproveitados de um Pokémon para o outro.
+        self.evolution_stage_frames = []
+        self.evolution_arrows = []
+        self.shown_evolution = None
+        self.no_evo_label = ctk.CTkLabel(self.evolution_frame, text="Não possui evoluções", font=self.font_small, text_color="gray50")
 
         right_frame = ctk.CTkFrame(content_container, fg_color=("gray88", "gray14"), corner_radius=10)
         right_frame.grid(row=0, column=1, sticky="nsew", padx=(10, 0))
@@ -220,25 +472,42 @@ class PokedexApp(ctk.CTk):
         
         self.locations_frame = ctk.CTkScrollableFrame(right_frame, label_text="Localização")
         self.locations_frame.pack(pady=10, padx=20, fill="both", expand=True)
+        self.location_sections = []
+        self.packed_location_sections = 0
+        self.shown_locations = None
+        self.no_loc_label = ctk.CTkLabel(self.locations_frame, text="Não encontrado em locais selvagens.", font=self.font_body, text_color="gray50")
 
     def setup_tray_icon(self):
         try:
             image = Image.open("poke.ico")
         except FileNotFoundError:
             image = Image.new('RGB', (64, 64), color = 'black')
-        menu = (pystray.MenuItem('Mostrar Pokedex', self.show_window, default=True), pystray.MenuItem('Sair', self.quit_app))
+        menu = (pystray.MenuItem('Mostrar Pokedex', self.show_window, default=True),
+                pystray.MenuItem('Sincronizar dados offline', self.start_offline_sync),
+                pystray.MenuItem('Exportar métricas', self.export_metrics),
+                pystray.MenuItem('Sair', self.quit_app))
         self.tray_icon = pystray.Icon("pokedex", image, "Pokedex Luxo", menu)
         self.tray_icon.run()
 
     def hide_window(self):
         self.withdraw()
+        self.window_hidden = True
+        # Sem janela visível não há por que gastar CPU com a animação.
+        if self._animation_job:
+            self.after_cancel(self._animation_job)
+            self._animation_job = None
 
     def show_window(self, icon=None, item=None):
+        self.window_hidden = False
+        if self._animation_position and not self._animation_job:
+            self.after(0, self._animate_gif, *self._animation_position)
         self.deiconify()
         self.attributes('-topmost', 1) # Traz a janela para a frente
         self.after(100, lambda: self.attributes('-topmost', 0)) # Permite que outras janelas fiquem por cima depois
 
     def quit_app(self, icon=None, item=None):
+        if os.environ.get(TRACE_ENV_VAR):
+            self.export_metrics(path=os.environ[TRACE_ENV_VAR] if os.environ[TRACE_ENV_VAR].endswith(".json") else None)
         if self.hotkey_listener and self.hotkey_listener.is_alive():
             self.hotkey_listener.stop()
         if self.tray_icon:
@@ -246,6 +515,24 @@ class PokedexApp(ctk.CTk):
         self.quit()
         sys.exit()
 
+    def export_metrics(self, icon=None, item=None, path=None):
+        """Exporta as métricas pelo serviço e informa onde o arquivo ficou."""
+        try:
+            path = self.service.export_metrics(path)
+            print(f"Métricas exportadas para {path}")
+        except OSError as e:
+            print(f"Não foi possível exportar as métricas: {e}")
+
+    def start_offline_sync(self, icon=None, item=None):
+        """Inicia a sincronização offline em segundo plano, se ainda não estiver rodando."""
+        if self.offline_sync_thread and self.offline_sync_thread.is_alive(): return
+        self.offline_sync_thread = threading.Thread(target=self.service.sync_offline, args=(self._print_sync_progress,), daemon=True)
+        self.offline_sync_thread.start()
+
+    def _print_sync_progress(self, done, total, name):
+        if done % 50 == 0 or done == total:
+            print(f"Sincronização offline: {done}/{total} ({name})")
+
     def setup_hotkey_listener(self):
         """Configura e inicia o ouvinte de atalho global."""
         hotkey = keyboard.HotKey(
@@ -274,29 +561,18 @@ class PokedexApp(ctk.CTk):
         self.loading_frame.place_forget()
 
     def update_font_sizes(self):
-        """Calcula e define os tamanhos de fonte com base no tamanho da janela."""
+        """Ajusta os tamanhos de fonte ao tamanho da janela, em degraus de FONT_SCALE_STEP; retorna se algo mudou."""
         height = self.winfo_height()
-        scale_factor = max(0.5, height / 720)
-        
-        self.font_title = ctk.CTkFont(family="Oswald", size=int(32 * scale_factor), weight="bold")
-        self.font_subtitle = ctk.CTkFont(family="Oswald", size=int(22 * scale_factor), weight="bold")
-        self.font_body = ctk.CTkFont(family="Oswald", size=int(16 * scale_factor))
-        self.font_button = ctk.CTkFont(family="Oswald", size=int(14 * scale_factor), weight="bold")
-        self.font_small = ctk.CTkFont(family="Oswald", size=int(12 * scale_factor))
-        self.font_icon = ctk.CTkFont(size=int(20 * scale_factor))
-
-    def _on_resize_debounce(self, event):
-        """Atrasa a chamada de redimensionamento para evitar sobrecarga."""
-        if self._resize_job:
-            self.after_cancel(self._resize_job)
-        self._resize_job = self.after(50, self.update_responsive_layout)
-
-    def update_responsive_layout(self):
-        """Função principal que ajusta a UI com base no tamanho da janela."""
-        self.update_font_sizes()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        
+        scale_step = round(max(0.5, height / 720) / FONT_SCALE_STEP)
+        if scale_step == self._font_scale: return False
+        self._font_scale = scale_step
+        # Os widgets guardam referências a estas fontes, então mudar o tamanho já atualiza todos eles.
+        for font, base_size in self._scaled_fonts:
+            font.configure(size=int(base_size * scale_step * FONT_SCALE_STEP))
+        return True
+
+    def assign_fonts(self):
+        """Liga os widgets criados sem fonte às fontes compartilhadas (uma única vez)."""
         self.back_button.configure(font=self.font_icon)
         self.forward_button.configure(font=self.font_icon)
         self.search_entry.configure(font=self.font_body)
@@ -315,36 +591,53 @@ class PokedexApp(ctk.CTk):
         for value_label in self.stat_values.values():
             value_label.configure(font=self.font_body)
 
-        if self.home_page.winfo_ismapped() and self.pokeball_image_pil:
-            img_size = int(min(width, height) * 0.35)
-            pokeball_image = ctk.CTkImage(light_image=self.pokeball_image_pil, size=(img_size, img_size))
-            self.home_image_label.configure(image=pokeball_image)
-        elif self.home_page.winfo_ismapped():
-             self.home_image_label.configure(font=ctk.CTkFont(family="Oswald", size=int(50 * (height / 720)), weight="bold"))
+    def _on_resize_debounce(self, event):
+        """Atrasa a chamada de redimensionamento para evitar sobrecarga.
 
-        if self.search_results_page.winfo_ismapped():
-            self.redraw_search_grid()
+        O <Configure> da janela também chega para cada widget filho e quando a janela só é movida; esses são ignorados.
+        """
+        if event.widget is not self or (event.width, event.height) == self._layout_size: return
+        if self._resize_job:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(50, self.update_responsive_layout)
 
-    def redraw_search_grid(self):
-        """Redesenha a grade de resultados com um número de colunas adaptativo."""
-        grid_width = self.search_results_grid.winfo_width()
-        card_min_width = 150
-        cols = max(2, grid_width // card_min_width)
-        
-        all_cards = self.search_results_grid.winfo_children()
-        for i, card in enumerate(all_cards):
-            row, col = divmod(i, cols)
-            card.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
+    def update_responsive_layout(self):
+        """Ajusta a UI ao tamanho da janela, sem trabalho algum se o tamanho não mudou."""
+        self._resize_job = None
+        size = (self.winfo_width(), self.winfo_height())
+        if size == self._layout_size: return
+        self._layout_size = size
+        self.update_font_sizes()
+        # A grade de resultados se reajusta sozinha pelo próprio <Configure>.
+        if self.home_page.winfo_ismapped():
+            self.update_home_image()
+
+    def update_home_image(self):
+        """Redimensiona a pokébola da tela inicial para o tamanho atual (em degraus de POKEBALL_SIZE_STEP)."""
+        if not self.pokeball_pyramid or self._layout_size is None: return
+        target = int(min(self._layout_size) * 0.35)
+        img_size = max(POKEBALL_SIZE_STEP, target // POKEBALL_SIZE_STEP * POKEBALL_SIZE_STEP)
+        if img_size == self.home_image_size: return
+        self.home_image_size = img_size
+        pokeball_image = self.pokeball_images.get(img_size)
+        if pokeball_image is None:
+            source = next((level for level in self.pokeball_pyramid if min(level.size) >= img_size), self.pokeball_pyramid[-1])
+            pokeball_image = self.pokeball_images[img_size] = ctk.CTkImage(light_image=source, size=(img_size, img_size))
+        self.home_image_label.configure(image=pokeball_image)
+
+    def set_catalog(self, entries):
+        """Instala um catálogo (e seu índice) vindo do disco ou da rede."""
+        self.service.set_catalog(entries)
+        self.pokemon_index = self.service.index
+        self.all_pokemon_list = self.service.catalog
+        self.update_pokedex_nav_buttons_state()
 
     def load_all_pokemon_names(self):
-        try:
-            response = requests.get("https://pokeapi.co/api/v2/pokemon?limit=1302", timeout=15)
-            response.raise_for_status()
-            results = response.json()['results']
-            self.all_pokemon_list = results
-            print("Catálogo de Pokémon (com todas as formas) carregado.")
-        except requests.RequestException as e:
-            print(f"Erro ao carregar catálogo: {e}")
+        """Atualiza o catálogo em segundo plano, baixando a lista completa apenas se ela mudou."""
+        entries = self.service.refresh_catalog()
+        if entries is None: return
+        self.after(0, self.set_catalog, entries)
+        print("Catálogo de Pokémon (com todas as formas) carregado.")
     
     def add_to_history(self, state):
         if self.history_index < len(self.navigation_history) - 1:
@@ -355,25 +648,25 @@ class PokedexApp(ctk.CTk):
 
     def search_pokemon_event(self, event=None):
         search_term = self.search_entry.get().strip().lower()
+        self._cancel_live_search()
+        self.live_search_term, self.live_search_matches = search_term, []
         if not search_term: return
         state = {'type': 'search', 'term': search_term}
         self.add_to_history(state)
         self.execute_search(search_term)
 
     def execute_search(self, search_term):
-        if not self.all_pokemon_list:
+        if not self.pokemon_index:
             self.after(1000, self.execute_search, search_term)
             return
 
-        matches = [p for p in self.all_pokemon_list if search_term in p['name']]
-        if search_term.isdigit():
-            matches = [p for p in self.all_pokemon_list if p['url'].split('/')[-2] == search_term]
+        matches = self.service.search(search_term)
 
-        self.current_search_id += 1
+        search_id, token = self._start_new_search()
         
         if len(matches) == 1:
             self.show_loading_screen()
-            threading.Thread(target=self.perform_detailed_search, args=(matches[0]['name'], self.current_search_id), daemon=True).start()
+            threading.Thread(target=self.perform_detailed_search, args=(matches[0]['name'], search_id, token), daemon=True).start()
         elif len(matches) > 1:
             self.display_search_results(matches)
         else:
@@ -381,72 +674,143 @@ class PokedexApp(ctk.CTk):
             self.reset_ui_for_search()
             self.name_label.configure(text="Nenhum Pokémon encontrado.")
             self.image_label.configure(image=self.blank_image, text="?")
+            self.hide_loading_screen()
 
-    def display_search_results(self, matches):
-        self.show_search_results_page()
-        for widget in self.search_results_grid.winfo_children():
-            widget.destroy()
+    def _start_new_search(self, continues=False):
+        """Inicia uma nova busca e cancela de fato o trabalho ainda em andamento da anterior.
 
-        self.grid_cards = []
-        grid_width = self.search_results_page.winfo_width()
-        card_min_width = 150
-        cols = max(2, grid_width // card_min_width)
-        
-        for i, pokemon in enumerate(matches):
-            self.after(i * 20, self.create_result_card, i, pokemon, cols)
-        
-        self.after(len(matches) * 20, self.setup_grid_nav)
+        Com continues, as métricas da nova busca contam a partir do início da anterior (ex.: a imagem da tela de detalhes).
+        """
+        self.service.perf.start_search(self.current_search_id + 1, parent=self.current_search_id if continues else None)
+        self.current_search_id += 1
+        self.search_token.cancel()
+        self.search_token = CancelToken()
+        return self.current_search_id, self.search_token
+
+    def on_search_typed(self, event=None):
+        """Agenda a busca incremental depois de uma pausa na digitação."""
+        term = self.search_entry.get().strip().lower()
+        if term == self.live_search_term: return
+        self._cancel_live_search()
+        self.live_search_job = self.after(LIVE_SEARCH_DELAY_MS, self.run_live_search, term)
+
+    def _cancel_live_search(self):
+        if self.live_search_job:
+            self.after_cancel(self.live_search_job)
+            self.live_search_job = None
+
+    def run_live_search(self, term):
+        """Busca incremental: refina o resultado anterior quando o termo só cresceu e atualiza a grade no lugar."""
+        # A medição começa quando a espera da digitação termina: o atraso proposital não conta.
+        fired = time.perf_counter()
+        self.live_search_job = None
+        if not self.pokemon_index: return
+        previous_term, previous_matches = self.live_search_term, self.live_search_matches
+        self.live_search_term = term
+        # A nova busca cancela um detalhe ainda carregando, que não vai mais esconder a tela de carregamento.
+        self._start_new_search()
+        self.hide_loading_screen()
+        if not term:
+            self.live_search_matches = []
+            self.show_home_page()
+            return
 
-    def create_result_card(self, i, pokemon, cols):
-        """Cria um único card de resultado para a animação."""
-        row, col = divmod(i, cols)
-        if col == 0: self.grid_cards.append([])
-        
-        poke_id = pokemon['url'].split('/')[-2]
+        # Resultados aproximados nunca contêm o termo; nesse caso não há o que refinar.
+        can_refine = (previous_term and term.startswith(previous_term) and not term.isdigit()
+                      and previous_matches and previous_term in previous_matches[0]['name'])
+        if can_refine:
+            matches = self.pokemon_index.refine(previous_matches, term) or self.service.search(term)
+        else:
+            matches = self.service.search(term)
+        self.live_search_matches = matches
+
+        if self.search_results_page.winfo_ismapped():
+            self.search_results_grid.update_items(matches)
+        else:
+            self.display_search_results(matches, take_focus=False)
+        self.after_idle(self._record_live_search_latency, term, fired)
+
+    def _record_live_search_latency(self, term, fired):
+        paint_ms = (time.perf_counter() - fired) * 1000
+        if paint_ms > FRAME_BUDGET_MS:
+            print(f"Busca incremental '{term}' levou {paint_ms:.1f} ms (acima de um quadro).")
+        self.service.perf.observe('live_search_paint', paint_ms)
+
+    def display_search_results(self, matches, take_focus=True):
+        self.show_search_results_page()
+        self._reset_grid_token()
+        self.search_results_grid.set_items(matches)
+        self.after_idle(self.service.perf.mark, 'time_to_first_paint', self.current_search_id)
+        self.setup_grid_nav(take_focus)
+
+    def _create_result_card(self, parent):
+        """Cria um card vazio para o conjunto reciclado da grade."""
+        return ctk.CTkButton(
+            parent, text="", image=self.blank_image, compound="top", font=self.font_small,
+            fg_color="gray20", hover_color="#D32F2F", border_width=2, border_color="gray20"
+        )
+
+    def _bind_result_card(self, card, index, pokemon, focused):
+        """Associa os dados de um Pokémon a um card reciclado."""
+        poke_id = pokemon['id']
         display_name = pokemon['name'].replace('-', ' ').title()
-        card = ctk.CTkButton(
-            self.search_results_grid, text=f"#{poke_id}\n{display_name}", 
-            image=self.blank_image, compound="top", font=self.font_small,
-            fg_color="gray20", hover_color="#D32F2F", border_width=2, border_color="gray20",
+        sprite_url = grid_sprite_url(poke_id)
+        cached = self.service.image_cache.peek(sprite_url)
+        card.configure(
+            text=f"#{poke_id}\n{display_name}",
+            image=ctk.CTkImage(light_image=cached, size=(96, 96)) if cached else self.blank_image,
+            border_color="#E53935" if focused else "gray20",
             command=partial(self.on_result_card_click, pokemon['name'])
         )
-        card.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-        self.grid_cards[row].append(card)
-        
-        sprite_url = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{poke_id}.png"
-        threading.Thread(target=self._fetch_sprite_for_grid, args=(sprite_url, card), daemon=True).start()
+        if cached is None:
+            token = self.grid_token
+            is_stale = lambda: token.cancelled or not self.search_results_grid.is_bound(card, index, pokemon)
+            self.sprite_pool.submit(index, self._fetch_grid_sprite, sprite_url, card, index, pokemon, token, is_stale=is_stale)
+
+    def _reset_grid_token(self):
+        """Cancela os downloads de sprites da grade anterior."""
+        self.grid_token.cancel()
+        self.grid_token = CancelToken()
 
-    def setup_grid_nav(self):
-        """Configura a navegação por teclado após a animação da grade."""
-        self.focused_card_index = (0, 0)
-        self.set_grid_focus()
+    def _fetch_grid_sprite(self, url, card, index, pokemon, token):
+        try:
+            ctk_image = ctk.CTkImage(light_image=self.service.image_cache.get(url, token=token), size=(96, 96))
+            self.after(0, self._apply_grid_sprite, ctk_image, card, index, pokemon, token)
+        except OperationCancelled:
+            pass
+        except (requests.RequestException, UnidentifiedImageError) as e:
+            print(f"Não foi possível carregar o sprite de {url}: {e}")
+
+    def _apply_grid_sprite(self, ctk_image, card, index, pokemon, token):
+        if token.cancelled: return
+        if self.search_results_grid.is_bound(card, index, pokemon):
+            card.configure(image=ctk_image)
+
+    def setup_grid_nav(self, take_focus=True):
+        """Configura a navegação por teclado da grade."""
         self.search_results_page.bind("<Up>", self.handle_key_nav)
         self.search_results_page.bind("<Down>", self.handle_key_nav)
         self.search_results_page.bind("<Left>", self.handle_key_nav)
         self.search_results_page.bind("<Right>", self.handle_key_nav)
         self.search_results_page.bind("<Return>", self.handle_key_select)
-        self.search_results_page.focus_set()
-
-    def set_grid_focus(self, old_index=None):
-        if old_index:
-            self.grid_cards[old_index[0]][old_index[1]].configure(border_color="gray20")
-        if self.focused_card_index:
-            self.grid_cards[self.focused_card_index[0]][self.focused_card_index[1]].configure(border_color="#E53935")
+        if take_focus:
+            self.search_results_page.focus_set()
 
     def handle_key_nav(self, event):
-        if not self.focused_card_index or not self.search_results_page.winfo_ismapped(): return
-        old_index, (row, col) = self.focused_card_index, self.focused_card_index
-        if event.keysym == "Up": row = max(0, row - 1)
-        elif event.keysym == "Down": row = min(len(self.grid_cards) - 1, row + 1)
-        elif event.keysym == "Left": col = max(0, col - 1)
-        elif event.keysym == "Right": col = min(len(self.grid_cards[row]) - 1, col + 1)
-        col = min(col, len(self.grid_cards[row]) - 1)
-        self.focused_card_index = (row, col)
-        self.set_grid_focus(old_index)
+        grid = self.search_results_grid
+        if grid.focused_index is None or not self.search_results_page.winfo_ismapped(): return
+        index = grid.focused_index
+        if event.keysym == "Up": index -= grid.cols
+        elif event.keysym == "Down": index += grid.cols
+        elif event.keysym == "Left": index -= 1
+        elif event.keysym == "Right": index += 1
+        if 0 <= index < len(grid.items):
+            grid.set_focus(index)
 
     def handle_key_select(self, event):
-        if not self.focused_card_index or not self.search_results_page.winfo_ismapped(): return
-        self.grid_cards[self.focused_card_index[0]][self.focused_card_index[1]].invoke()
+        grid = self.search_results_grid
+        if grid.focused_index is None or not self.search_results_page.winfo_ismapped(): return
+        self.on_result_card_click(grid.items[grid.focused_index]['name'])
 
     def handle_backspace_nav(self, event=None):
         if self.focus_get() != self.search_entry:
@@ -454,115 +818,31 @@ class PokedexApp(ctk.CTk):
             self.search_entry.icursor(ctk.END)
             return "break"
 
-    def _fetch_sprite_for_grid(self, url, card):
+    def _fetch_evolution_sprite(self, pokemon_id, card, size):
+        url = grid_sprite_url(pokemon_id)
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            pil_image = Image.open(BytesIO(response.content))
-            ctk_image = ctk.CTkImage(light_image=pil_image, size=(96, 96))
-            self.after(0, lambda: card.configure(image=ctk_image))
+            ctk_image = ctk.CTkImage(light_image=self.service.image_cache.get(url), size=(size, size))
+            # O card pode ter sido reaproveitado para outro Pokémon (ou outro tamanho) enquanto o sprite carregava.
+            self.after(0, lambda: (card.pokemon_id, card.sprite_size) == (pokemon_id, size) and card.configure(image=ctk_image))
         except (requests.RequestException, UnidentifiedImageError) as e:
             print(f"Não foi possível carregar o sprite de {url}: {e}")
 
     def on_result_card_click(self, pokemon_name):
         state = {'type': 'detail', 'name': pokemon_name}
         self.add_to_history(state)
-        self.current_search_id += 1
+        search_id, token = self._start_new_search()
         self.show_loading_screen()
-        threading.Thread(target=self.perform_detailed_search, args=(pokemon_name, self.current_search_id), daemon=True).start()
+        threading.Thread(target=self.perform_detailed_search, args=(pokemon_name, search_id, token), daemon=True).start()
 
-    def perform_detailed_search(self, pokemon_name, search_id):
-        if search_id != self.current_search_id: return
-        
-        if pokemon_name in self.api_cache:
-            cached_data = self.api_cache[pokemon_name]
-            cached_data['search_id'] = search_id
-            self.after(0, self.handle_search_result, cached_data)
-            return
+    def perform_detailed_search(self, pokemon_name, search_id, token):
+        result = self.service.lookup(pokemon_name, search_id, token)
+        if result is not None:
+            self.after(0, self.handle_search_result, result)
 
-        result = {'search_id': search_id, 'status': None, 'data': None, 'locations': None, 'flavor_text': None, 'pt_name': None, 'evolution_chain': None}
-        try:
-            pokemon_url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name}"
-            response = requests.get(pokemon_url, timeout=10)
-            response.raise_for_status()
-            pokemon_data = response.json()
-            result['data'] = pokemon_data
-            
-            species_url = pokemon_data['species']['url']
-            species_response = requests.get(species_url, timeout=10)
-            species_response.raise_for_status()
-            species_data = species_response.json()
-            result['flavor_text'] = self.parse_flavor_text(species_data)
-            result['pt_name'] = self.parse_pokemon_name(species_data, pokemon_name)
-
-            evolution_url = species_data['evolution_chain']['url']
-            evolution_response = requests.get(evolution_url, timeout=10)
-            evolution_response.raise_for_status()
-            result['evolution_chain'] = self.parse_evolution_chain(evolution_response.json()['chain'])
-
-            encounters_url = pokemon_data['location_area_encounters']
-            encounter_response = requests.get(encounters_url, timeout=10)
-            encounter_response.raise_for_status()
-            result['locations'] = self.parse_encounter_data(encounter_response.json())
-            
-            result['status'] = 'success'
-            self.api_cache[pokemon_name] = result.copy()
-        except requests.exceptions.RequestException:
-            result['status'] = 'error'
-        
-        self.after(0, self.handle_search_result, result)
-
-    def parse_evolution_chain(self, chain_data):
-        """Processa recursivamente os dados da cadeia evolutiva."""
-        chain = []
-        current = chain_data
-        while current:
-            species_name = current['species']['name']
-            species_id = current['species']['url'].split('/')[-2]
-            chain.append({'name': species_name, 'id': species_id})
-            if current['evolves_to']:
-                current = current['evolves_to'][0]
-            else:
-                current = None
-        return chain
-
-    def parse_pokemon_name(self, species_data, fallback_name):
-        """Extrai o nome em PT-BR, com fallback para o nome original."""
-        for name_info in species_data.get('names', []):
-            if name_info.get('language', {}).get('name') == 'pt':
-                return name_info['name']
-        return fallback_name.replace('-', ' ').title()
-
-    def parse_flavor_text(self, species_data):
-        """Extrai a descrição da Pokédex, priorizando PT e usando EN como fallback."""
-        pt_text = None
-        en_text = None
-        for entry in species_data.get('flavor_text_entries', []):
-            lang_name = entry.get('language', {}).get('name')
-            if lang_name == 'pt':
-                pt_text = entry['flavor_text'].replace('\n', ' ').replace('\f', ' ')
-                break
-            elif lang_name == 'en' and en_text is None:
-                en_text = entry['flavor_text'].replace('\n', ' ').replace('\f', ' ')
-        return pt_text or en_text or "Nenhuma descrição disponível."
-
-    def parse_encounter_data(self, encounter_data):
-        """Processa os dados de encontro para agrupar por versão de jogo."""
-        locations_by_version = {}
-        if not encounter_data: return {}
-        
-        for encounter in encounter_data:
-            location_name = encounter['location_area']['name'].replace('-', ' ').replace('route', 'rota').title()
-            for version_details in encounter['version_details']:
-                version_name = version_details['version']['name'].replace('-', ' ').title()
-                if version_name not in locations_by_version:
-                    locations_by_version[version_name] = set()
-                locations_by_version[version_name].add(location_name)
-        
-        for version_name in locations_by_version:
-            locations_by_version[version_name] = sorted(list(locations_by_version[version_name]))
-            
-        return locations_by_version
+    def schedule_prefetch(self, pokedex_id, evolution_chain):
+        """Agenda o pré-carregamento dos vizinhos e da família evolutiva do Pokémon exibido."""
+        current_name = self.current_pokemon_data['name'] if self.current_pokemon_data else None
+        self.service.schedule_prefetch(pokedex_id, evolution_chain, current_name, self._artwork_box(), self.image_label._get_widget_scaling())
 
     def handle_search_result(self, result):
         if result['search_id'] != self.current_search_id: 
@@ -570,16 +850,20 @@ class PokedexApp(ctk.CTk):
             return
             
         self.show_detail_page()
-        self.reset_ui_for_search()
         
         if result['status'] == 'success':
-            self.display_pokemon_info(result['data'], result['locations'], result['flavor_text'], result['pt_name'], result['evolution_chain'])
+            # display_pokemon_info sobrescreve cada painel no lugar, então não há o que limpar antes.
+            self._stop_animation()
+            with self.service.perf.span('display', result['search_id']):
+                self.display_pokemon_info(result['data'], result['locations'], result['flavor_text'], result['pt_name'], result['evolution_stages'])
+            self.service.perf.mark('time_to_detail', result['search_id'])
         else:
+            self.reset_ui_for_search()
             self.name_label.configure(text="Erro ao buscar detalhes.")
             self.image_label.configure(image=self.blank_image, text="!")
             self.hide_loading_screen()
 
-    def display_pokemon_info(self, data, locations, flavor_text, pt_name, evolution_chain):
+    def display_pokemon_info(self, data, locations, flavor_text, pt_name, evolution_stages):
         """Preenche a página de detalhes com todas as informações do Pokémon."""
         self.current_pokemon_data = data
         self.show_shiny = False
@@ -593,7 +877,7 @@ class PokedexApp(ctk.CTk):
         self.name_label.configure(text=f"{pt_name} #{pokedex_id}")
         self.pokedex_entry_label.configure(text=flavor_text)
         
-        self.update_pokemon_image()
+        self.update_pokemon_image(continues_search=True)
         
         type1_name_en = types[0]
         type1_name_pt = TYPE_TRANSLATIONS.get(type1_name_en, type1_name_en.title())
@@ -605,6 +889,8 @@ class PokedexApp(ctk.CTk):
             type2_name_en = types[1]
             type2_name_pt = TYPE_TRANSLATIONS.get(type2_name_en, type2_name_en.title())
             self.type2_label.configure(text=type2_name_pt, fg_color=TYPE_COLORS.get(type2_name_en, "#FFF"), text_color=self.get_text_color(TYPE_COLORS.get(type2_name_en, "#FFF")))
+        else:
+            self.type2_label.pack_forget()
         
         api_stats = {s['stat']['name']: s['base_stat'] for s in data['stats']}
         for stat_en in self.stats_to_display:
@@ -612,41 +898,84 @@ class PokedexApp(ctk.CTk):
             self.stat_bars[stat_en].set(value / 255)
             self.stat_values[stat_en].configure(text=str(value))
             
-        for widget in self.locations_frame.winfo_children():
-            widget.destroy()
-            
-        if not locations:
-            no_loc_label = ctk.CTkLabel(self.locations_frame, text="Não encontrado em locais selvagens.", font=self.font_body, text_color="gray50")
-            no_loc_label.pack(pady=10)
+        self.show_locations(locations)
+        self.show_evolutions(evolution_stages)
+        evolution_chain = [pokemon for stage in evolution_stages for pokemon in stage]
+        self.schedule_prefetch(pokedex_id, evolution_chain)
+
+    def show_locations(self, locations):
+        """Atualiza o painel de locais reaproveitando as seções já criadas; nada é refeito se os locais não mudaram."""
+        if locations == self.shown_locations: return
+        self.shown_locations = locations
+        items = sorted(locations.items()) if locations else []
+        if items:
+            self.no_loc_label.pack_forget()
         else:
-            for version, areas in sorted(locations.items()):
-                version_label = ctk.CTkLabel(self.locations_frame, text=f"Pokémon {version}:", font=self.font_button, anchor="w")
-                version_label.pack(fill="x", padx=5, pady=(8, 2))
-                for area in areas:
-                    area_label = ctk.CTkLabel(self.locations_frame, text=f"  • {area}", font=self.font_small, anchor="w")
-                    area_label.pack(fill="x", padx=10)
-
-        for widget in self.evolution_frame.winfo_children():
-            widget.destroy()
-        
-        if len(evolution_chain) > 1:
-            for i, pokemon in enumerate(evolution_chain):
-                evo_card = ctk.CTkButton(
-                    self.evolution_frame, text=pokemon['name'].replace('-', ' ').title(),
-                    image=self.blank_image, compound="top", font=self.font_small,
-                    fg_color="transparent", hover_color="gray25",
-                    command=partial(self.on_result_card_click, pokemon['name'])
-                )
-                evo_card.pack(side="left", padx=5, expand=True)
-                sprite_url = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pokemon['id']}.png"
-                threading.Thread(target=self._fetch_sprite_for_grid, args=(sprite_url, evo_card), daemon=True).start()
-
-                if i < len(evolution_chain) - 1:
-                    arrow_label = ctk.CTkLabel(self.evolution_frame, text="→", font=self.font_subtitle)
-                    arrow_label.pack(side="left", padx=5)
+            self.no_loc_label.configure(font=self.font_body)
+            self.no_loc_label.pack(pady=10)
+        for i, (version, areas) in enumerate(items):
+            if i == len(self.location_sections):
+                self.location_sections.append(LocationSection(self.locations_frame))
+            self.location_sections[i].set(version, areas, self.font_button, self.font_small, expanded=len(items) == 1)
+        # As seções visíveis são sempre um prefixo da lista, então a ordem de empacotamento se mantém.
+        for section in self.location_sections[self.packed_location_sections:len(items)]:
+            section.pack(fill="x", padx=5, pady=(4, 0))
+        for section in self.location_sections[len(items):self.packed_location_sections]:
+            section.pack_forget()
+        self.packed_location_sections = len(items)
+
+    def show_evolutions(self, evolution_stages):
+        """Atualiza a cadeia evolutiva reaproveitando colunas, cards e setas; dentro da mesma família nada é refeito."""
+        shown = tuple(tuple(pokemon['id'] for pokemon in stage) for stage in evolution_stages)
+        if shown == self.shown_evolution: return
+        self.shown_evolution = shown
+        stages = evolution_stages if sum(map(len, evolution_stages)) > 1 else []
+        if stages:
+            self.no_evo_label.grid_remove()
         else:
-            no_evo_label = ctk.CTkLabel(self.evolution_frame, text="Não possui evoluções", font=self.font_small, text_color="gray50")
-            no_evo_label.pack()
+            self.no_evo_label.configure(font=self.font_small)
+            self.no_evo_label.grid(row=0, column=0)
+
+        # Um estágio por coluna; até duas ramificações ficam empilhadas, mais que isso (Eevee...) vira uma grade
+        # de sprites menores em linhas de EVOLUTION_COMPACT_COLUMNS, para não espremer a artwork na altura mínima.
+        for i, stage in enumerate(stages):
+            if i == len(self.evolution_stage_frames):
+                stage_frame = ctk.CTkFrame(self.evolution_frame, fg_color="transparent")
+                stage_frame.cards = []
+                self.evolution_stage_frames.append(stage_frame)
+                self.evolution_arrows.append(ctk.CTkLabel(self.evolution_frame, text="→"))
+            stage_frame = self.evolution_stage_frames[i]
+            stage_frame.grid(row=0, column=2 * i, padx=5)
+            self.evolution_frame.columnconfigure(2 * i, weight=1)
+            compact = len(stage) >= EVOLUTION_COMPACT_BRANCHES
+            size = EVOLUTION_COMPACT_SPRITE_SIZE if compact else EVOLUTION_SPRITE_SIZE
+            for j, pokemon in enumerate(stage):
+                if j == len(stage_frame.cards):
+                    card = ctk.CTkButton(stage_frame, text="", image=self.blank_image, compound="top",
+                                         fg_color="transparent", hover_color="gray25")
+                    card.pokemon_id = card.sprite_size = None
+                    stage_frame.cards.append(card)
+                card = stage_frame.cards[j]
+                if (card.pokemon_id, card.sprite_size) != (pokemon['id'], size):
+                    card.pokemon_id, card.sprite_size = pokemon['id'], size
+                    card.configure(text=pokemon['name'].replace('-', ' ').title(), image=self.blank_image, font=self.font_small,
+                                   width=size + 16 if compact else EVOLUTION_CARD_WIDTH, command=partial(self.on_result_card_click, pokemon['name']))
+                    self.sprite_pool.submit(0, self._fetch_evolution_sprite, pokemon['id'], card, size)
+                if compact: card.grid(row=j // EVOLUTION_COMPACT_COLUMNS, column=j % EVOLUTION_COMPACT_COLUMNS, padx=1, pady=1)
+                else: card.grid(row=j, column=0, padx=2, pady=2)
+            for card in stage_frame.cards[len(stage):]:
+                card.grid_remove()
+            arrow = self.evolution_arrows[i]
+            if i < len(stages) - 1:
+                arrow.configure(font=self.font_subtitle)
+                arrow.grid(row=0, column=2 * i + 1, padx=5)
+            else:
+                arrow.grid_remove()
+        for i in range(len(stages), len(self.evolution_stage_frames)):
+            self.evolution_stage_frames[i].grid_remove()
+            self.evolution_arrows[i].grid_remove()
+            self.evolution_frame.columnconfigure(2 * i, weight=0)
+        if not stages: self.evolution_frame.columnconfigure(0, weight=1)
 
     def go_back(self):
         if self.history_index > 0:
@@ -665,112 +994,105 @@ class PokedexApp(ctk.CTk):
         self.search_entry.insert(0, display_term)
         if state['type'] == 'search': self.execute_search(state['term'])
         elif state['type'] == 'detail':
-            self.current_search_id += 1
+            search_id, token = self._start_new_search()
             self.show_loading_screen()
-            threading.Thread(target=self.perform_detailed_search, args=(state['name'], self.current_search_id), daemon=True).start()
+            threading.Thread(target=self.perform_detailed_search, args=(state['name'], search_id, token), daemon=True).start()
         self.update_navigation_buttons_state()
 
     def update_navigation_buttons_state(self):
         self.back_button.configure(state="normal" if self.history_index > 0 else "disabled")
         self.forward_button.configure(state="normal" if self.history_index < len(self.navigation_history) - 1 else "disabled")
 
-    def update_pokemon_image(self):
+    def update_pokemon_image(self, continues_search=False):
         """Busca a imagem apropriada (normal ou shiny) para o Pokémon atual."""
         if not self.current_pokemon_data: return
 
-        self.current_search_id += 1
+        search_id, token = self._start_new_search(continues=continues_search)
         self.image_label.configure(image=self.blank_image, text="")
 
-        sprites = self.current_pokemon_data.get('sprites', {})
-        sources_to_try = []
-        
-        artwork_key = 'front_shiny' if self.show_shiny else 'front_default'
-        gif_key = 'front_shiny' if self.show_shiny else 'front_default'
-        sprite_key = 'front_shiny' if self.show_shiny else 'front_default'
-
-        try:
-            if url := sprites['versions']['generation-v']['black-white']['animated'][gif_key]:
-                sources_to_try.append({'type': 'gif', 'url': url})
-        except (KeyError, TypeError): pass
-        try:
-            if url := sprites['other']['official-artwork'][artwork_key]:
-                sources_to_try.append({'type': 'artwork', 'url': url})
-        except (KeyError, TypeError): pass
-        if url := sprites.get(sprite_key):
-            sources_to_try.append({'type': 'sprite', 'url': url})
+        sources_to_try = image_sources(self.current_pokemon_data.get('sprites', {}), self.show_shiny)
 
         if sources_to_try:
-            self.fetch_image_with_fallback(sources_to_try, self.current_search_id)
+            self.fetch_image_with_fallback(sources_to_try, search_id, token)
         else:
             self.image_label.configure(image=self.blank_image, text="Imagem\nnão disponível")
 
-    def fetch_image_with_fallback(self, sources, search_id):
-        if search_id != self.current_search_id: return
-        self._try_next_image_source(sources, 0, search_id)
-
-    def _try_next_image_source(self, sources, index, search_id):
-        if search_id != self.current_search_id: return
-        if index < len(sources):
-            source = sources[index]
-            threading.Thread(target=self._download_image_thread, args=(source, sources, index, search_id), daemon=True).start()
-        else: 
+    def fetch_image_with_fallback(self, sources, search_id, token):
+        if token.cancelled: return
+        scaling = self.image_label._get_widget_scaling()
+        self.image_pool.submit(0, self._prepare_detail_image, sources, search_id, token, self._artwork_box(), scaling,
+                               is_stale=lambda: token.cancelled)
+
+    def _prepare_detail_image(self, sources, search_id, token, artwork_box, scaling):
+        """Baixa, decodifica e redimensiona a primeira fonte disponível fora da thread da interface."""
+        prepared = self.service.load_detail_image(sources, artwork_box, scaling, token, search_id,
+                                                  on_ready=lambda prepared: self.after(0, self._show_detail_image, prepared, search_id))
+        if prepared is None and not token.cancelled:
             self.after(0, self._handle_image_error, search_id)
 
-    def _download_image_thread(self, source, all_sources, index, search_id):
+    def _show_detail_image(self, prepared, search_id):
+        """Parte da thread da interface: só embrulha as imagens prontas e as exibe."""
         if search_id != self.current_search_id: return
-        try:
-            response = requests.get(source['url'], timeout=10)
-            response.raise_for_status()
-            self.after(0, self._process_image_data, response.content, source, search_id)
-        except (requests.RequestException, UnidentifiedImageError) as e:
-            print(f"Falha ao carregar {source['type']} de {source['url']}: {e}. Tentando próximo...")
-            self.after(0, self._try_next_image_source, all_sources, index + 1, search_id)
-
-    def _process_image_data(self, img_data, source, search_id):
-        if search_id != self.current_search_id: 
-            self.hide_loading_screen()
-            return
-        try:
-            pil_image = Image.open(BytesIO(img_data))
-            if source['type'] == 'gif': self._process_gif(pil_image, search_id)
-            else: self._create_static_image(pil_image, source['type'])
-        except Exception as e:
-            print(f"Erro ao processar imagem: {e}")
-            self._handle_image_error(search_id)
-        finally:
-            if search_id == self.current_search_id:
-                self.hide_loading_screen()
-
-    def _process_gif(self, pil_image, search_id):
-        self.animation_frames = []
-        scale = 3
-        try:
-            for frame in ImageSequence.Iterator(pil_image):
-                duration = frame.info.get('duration', 100)
-                ctk_frame = ctk.CTkImage(light_image=frame.convert("RGBA"), size=(frame.width * scale, frame.height * scale))
-                self.animation_frames.append((ctk_frame, duration))
-            if self.animation_frames: self._animate_gif(0, search_id)
-        except Exception as e:
-            print(f"Erro ao processar GIF: {e}")
-            self._create_static_image(pil_image, 'sprite')
+        started = time.perf_counter()
+        if prepared['type'] == 'gif':
+            self._stop_animation()
+            self.current_animation = prepared['animation']
+            self._animate_gif(0, search_id)
+        else:
+            self._stop_animation()
+            self.pokemon_image = ctk.CTkImage(light_image=prepared['image'], size=prepared['display_size'])
+            self.image_label.configure(image=self.pokemon_image, text="")
+        self.hide_loading_screen()
+        ended = time.perf_counter()
+        self.service.perf.record('show_image', started, ended, search_id, source=prepared['type'])
+        self.service.perf.observe('image_stall', (ended - started) * 1000)
+        self.service.perf.mark('time_to_first_paint', search_id)
 
     def _animate_gif(self, frame_index, search_id):
-        if search_id != self.current_search_id or not self.animation_frames: return
-        frame_image, delay = self.animation_frames[frame_index]
+        self._animation_job = None
+        animation = self.current_animation
+        if search_id != self.current_search_id or animation is None:
+            self._animation_position = None
+            return
+        self._animation_position = (frame_index, search_id)
+        if self.window_hidden: return
+        if frame_index >= len(animation.frames):
+            if not animation.complete:
+                # O quadro ainda está sendo decodificado em segundo plano.
+                self._animation_job = self.after(ANIMATION_WAIT_MS, self._animate_gif, frame_index, search_id)
+                return
+            frame_index = 0
+        frame_image, delay = self._animation_frame(animation, frame_index)
         self.image_label.configure(image=frame_image)
-        self.after(delay, self._animate_gif, (frame_index + 1) % len(self.animation_frames), search_id)
-
-    def _create_static_image(self, pil_image, image_type):
+        self._animation_job = self.after(delay, self._animate_gif, frame_index + 1, search_id)
+
+    def _animation_frame(self, animation, index):
+        """Quadro como CTkImage, criado uma única vez por animação (LRU com o mesmo tamanho do cache de animações)."""
+        frames = self.animation_frames.get(animation)
+        if frames is None:
+            frames = self.animation_frames[animation] = []
+            while len(self.animation_frames) > ANIMATION_CACHE_SIZE:
+                self.animation_frames.popitem(last=False)
+        else:
+            self.animation_frames.move_to_end(animation)
+        while len(frames) <= index:
+            pixels, display_size, duration = animation.frames[len(frames)]
+            frames.append((ctk.CTkImage(light_image=pixels, size=display_size), duration))
+        return frames[index]
+
+    def _stop_animation(self):
+        if self._animation_job:
+            self.after_cancel(self._animation_job)
+            self._animation_job = None
+        self.current_animation = None
+        self._animation_position = None
+
+    def _artwork_box(self):
+        """Caixa em que a artwork deve caber, acompanhando o espaço disponível."""
         container_size = min(self.image_placeholder.winfo_width(), self.image_placeholder.winfo_height())
-        if image_type == 'artwork':
-            size = int(container_size * 0.9)
-            if size < 1: size = 250
-            pil_image.thumbnail((size, size), Image.Resampling.LANCZOS)
-            self.pokemon_image = ctk.CTkImage(light_image=pil_image.convert("RGBA"), size=pil_image.size)
-        else: # sprite
-            scale = 5
-            self.pokemon_image = ctk.CTkImage(light_image=pil_image.convert("RGBA"), size=(pil_image.width * scale, pil_image.height * scale))
-        self.image_label.configure(image=self.pokemon_image, text="")
+        size = int(container_size * 0.9)
+        if size < 1: size = 250
+        return (size, size)
 
     def _handle_image_error(self, search_id):
         if search_id == self.current_search_id:
@@ -778,11 +1100,10 @@ class PokedexApp(ctk.CTk):
             self.hide_loading_screen()
 
     def reset_ui_for_search(self):
-        self.animation_frames = [] 
+        self._stop_animation()
         self.clear_info_panels()
         self.name_label.configure(text="")
         self.image_label.configure(image=self.blank_image, text="")
-        self.update_idletasks()
 
     def clear_info_panels(self):
         self.type1_label.pack_forget()
@@ -791,14 +1112,21 @@ class PokedexApp(ctk.CTk):
         for stat in self.stat_labels:
             self.stat_bars[stat].set(0)
             self.stat_values[stat].configure(text="")
-        for widget in self.locations_frame.winfo_children():
-            widget.destroy()
+        # Os widgets dos painéis só são escondidos; show_locations/show_evolutions voltam a usá-los.
+        for section in self.location_sections[:self.packed_location_sections]:
+            section.pack_forget()
+        self.packed_location_sections = 0
+        self.no_loc_label.pack_forget()
+        self.shown_locations = None
         for widget in self.evolution_frame.winfo_children():
-            widget.destroy()
+            widget.grid_remove()
+        self.shown_evolution = None
 
     def refresh_app(self, event=None):
-        self.current_search_id += 1
+        self._start_new_search()
         self.search_entry.delete(0, 'end')
+        self._cancel_live_search()
+        self.live_search_term = ""
         self.navigation_history.clear()
         self.history_index = -1
         self.update_navigation_buttons_state()
@@ -806,20 +1134,26 @@ class PokedexApp(ctk.CTk):
         self.search_entry.focus_set()
 
     def show_detail_page(self):
+        self._reset_grid_token()
         self.home_page.pack_forget()
         self.search_results_page.pack_forget()
         self.detail_page.pack(fill="both", expand=True)
         self.detail_page.focus_set()
 
     def show_search_results_page(self):
+        # Estas páginas não carregam nada; um detalhe cancelado no caminho não esconderia a tela de carregamento.
+        self.hide_loading_screen()
         self.home_page.pack_forget()
         self.detail_page.pack_forget()
         self.search_results_page.pack(fill="both", expand=True)
 
     def show_home_page(self):
+        self.hide_loading_screen()
+        self._reset_grid_token()
         self.detail_page.pack_forget()
         self.search_results_page.pack_forget()
         self.home_page.pack(fill="both", expand=True)
+        self.update_home_image()
 
     def handle_escape(self, event=None):
         self.go_back()
@@ -883,6 +1217,59 @@ class PokedexApp(ctk.CTk):
             self.prev_pokemon_button.configure(state="disabled")
             self.next_pokemon_button.configure(state="disabled")
 
+def run_offline_sync():
+    """Executa a sincronização offline pela linha de comando."""
+    service = PokedexService(CACHE_DIR)
+    try:
+        failed = service.sync_offline(lambda done, total, name: print(f"{done}/{total} {name}"))
+    except KeyboardInterrupt:
+        print("Sincronização interrompida; ela continuará de onde parou na próxima execução.")
+        return
+    if failed:
+        print(f"{len(failed)} Pokémon falharam; execute novamente para tentar outra vez.")
+
+def read_batch_queries(source):
+    """Nomes ou ids, um por linha ou separados por vírgula; linhas vazias e comentários (#) são ignorados."""
+    for line in source:
+        if line.lstrip().startswith("#"): continue
+        for query in line.split(","):
+            if query.strip(): yield query.strip()
+
+def run_batch_lookup(path, jobs, output_path=None):
+    """Resolve uma lista de Pokémon pela linha de comando, escrevendo JSONL à medida que os resultados ficam prontos."""
+    service = PokedexService(CACHE_DIR)
+    catalog = service.load_cached_catalog()
+    if catalog: service.set_catalog(catalog)
+    source = output = None
+    counts = {}
+    try:
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        output = open(output_path, "w", encoding="utf-8") if output_path else sys.stdout
+        for record in service.batch_lookup(read_batch_queries(source), jobs):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            counts[record['status']] = counts.get(record['status'], 0) + 1
+    except KeyboardInterrupt:
+        print("Busca em lote interrompida.", file=sys.stderr)
+    except OSError as e:
+        print(f"Erro na busca em lote: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if source not in (None, sys.stdin): source.close()
+        if output not in (None, sys.stdout): output.close()
+    print("Busca em lote concluída: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())), file=sys.stderr)
+
 if __name__ == "__main__":
-    app = PokedexApp()
-    app.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pokedex")
+    parser.add_argument("--sync", action="store_true", help="espelha a PokeAPI e os sprites para uso offline e sai")
+    parser.add_argument("--batch", metavar="ARQUIVO", help="resolve os nomes/ids do arquivo ('-' para a entrada padrão) e escreve JSONL")
+    parser.add_argument("--jobs", type=int, default=BATCH_WORKERS, help=f"buscas simultâneas no modo --batch (padrão: {BATCH_WORKERS})")
+    parser.add_argument("-o", "--output", metavar="ARQUIVO", help="arquivo de saída do modo --batch (padrão: saída padrão)")
+    args = parser.parse_args()
+    if args.sync:
+        run_offline_sync()
+    elif args.batch:
+        run_batch_lookup(args.batch, max(1, args.jobs), args.output)
+    else:
+        app = PokedexApp()
+        app.mainloop()
\ No newline at end of file
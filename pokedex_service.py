@@ -0,0 +1,1627 @@
+"""Motor de dados da Pokedex: rede, caches, catálogo, detalhes, imagens e pré-carregamento, sem depender de interface."""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import queue
+import itertools
+import bisect
+import asyncio
+from collections import defaultdict, deque, OrderedDict
+from PIL import Image
+from io import BytesIO
+from functools import partial
+import os
+import re
+import math
+import operator
+import json
+import time
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy, só as consultas por tipo e atributo ficam indisponíveis.
+    np = None
+
+# Podem ser trocados por um servidor local (ex.: benchmark.py) pelas variáveis de ambiente.
+POKEAPI_BASE_URL = os.environ.get("POKEDEX_API_BASE", "https://pokeapi.co/api/v2").rstrip("/")
+SPRITES_BASE_URL = os.environ.get("POKEDEX_SPRITES_BASE", "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon").rstrip("/")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pokedex")
+CATALOG_SNAPSHOT_PATH = os.path.join(CACHE_DIR, "catalog.json")
+OFFLINE_CATALOG_URL = f"{POKEAPI_BASE_URL}/pokemon?limit=100000"
+API_CACHE_TTL = 7 * 24 * 3600
+API_CACHE_ACCESS_FLUSH_INTERVAL = 30
+API_CACHE_ACCESS_FLUSH_BATCH = 256
+API_CACHE_MAX_BYTES = 64 * 1024 * 1024
+IMAGE_MEMORY_BUDGET = 64 * 1024 * 1024
+IMAGE_DISK_MAX_BYTES = 256 * 1024 * 1024
+IMAGE_DISK_TTL = 30 * 24 * 3600
+SLOW_STAGE_THRESHOLD = 1.0
+HTTP_TIMEOUT = 10
+HTTP_MAX_PER_HOST = 8
+HTTP_RETRIES = 3
+HTTP_CHUNK_SIZE = 16 * 1024
+CANCEL_POLL_INTERVAL = 0.05
+GIF_SCALE = 3
+SPRITE_SCALE = 5
+ANIMATION_CACHE_SIZE = 8
+PREFETCH_RADIUS = 2
+PREFETCH_BUDGET = 8
+PREFETCH_IDLE_WAIT = 0.05
+BATCH_WORKERS = 8
+NGRAM_SIZE = 3
+FUZZY_MAX_DISTANCE = 2
+SYNC_MIN_INTERVAL = 0.1
+TRACE_DIR = os.path.join(CACHE_DIR, "traces")
+STAT_FIELDS = ("hp", "attack", "defense", "special_attack", "special_defense", "speed")
+STAT_ALIASES = {
+    "hp": "hp", "attack": "attack", "atk": "attack", "defense": "defense", "def": "defense",
+    "special-attack": "special_attack", "spatk": "special_attack", "special-defense": "special_defense", "spdef": "special_defense",
+    "speed": "speed", "spe": "speed", "total": "total", "id": "id",
+}
+LOCATION_FILTERS = ("area", "version")
+TYPE_NAMES = ("normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison", "ground",
+              "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy")
+PERF_MAX_SPANS = 20000
+PERF_HISTOGRAM_SIZE = 500
+PERF_TRACKED_SEARCHES = 256
+
+def percentile(values, fraction):
+    """Percentil por posição mais próxima; None se não houver amostras."""
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return hits / total if total else None
+
+class PerfRecorder:
+    """Registra intervalos (spans) das etapas de cada busca e histogramas de latência; exporta no formato Chrome trace."""
+    def __init__(self, max_spans=PERF_MAX_SPANS, histogram_size=PERF_HISTOGRAM_SIZE):
+        self.origin = time.perf_counter()
+        self.histograms = defaultdict(lambda: deque(maxlen=histogram_size))
+        self._spans = deque(maxlen=max_spans)
+        self._thread_names = {}
+        self._searches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end, search_id=None, **args):
+        """Registra um intervalo já medido (tempos de time.perf_counter) na thread atual."""
+        thread = threading.current_thread()
+        if search_id is not None: args['search_id'] = search_id
+        with self._lock:
+            self._thread_names[thread.ident] = thread.name
+            self._spans.append((name, start, end, thread.ident, args))
+
+    @contextmanager
+    def span(self, name, search_id=None, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), search_id, **args)
+
+    def start_search(self, search_id, parent=None):
+        """Marca o início de uma busca; com parent, ela continua contando a partir do início da busca original."""
+        with self._lock:
+            started = self._searches.get(parent, (time.perf_counter(), None))[0]
+            self._searches[search_id] = (started, set())
+            while len(self._searches) > PERF_TRACKED_SEARCHES:
+                self._searches.popitem(last=False)
+
+    def mark(self, metric, search_id):
+        """Registra no histograma o tempo desde o início da busca até agora (só a primeira vez por busca)."""
+        with self._lock:
+            entry = self._searches.get(search_id)
+            if entry is None or metric in entry[1]: return
+            entry[1].add(metric)
+            self.histograms[metric].append((time.perf_counter() - entry[0]) * 1000)
+
+    def observe(self, metric, value_ms):
+        with self._lock:
+            self.histograms[metric].append(value_ms)
+
+    def summary(self):
+        with self._lock:
+            histograms = {metric: list(values) for metric, values in self.histograms.items()}
+        return {metric: {'count': len(values), 'p50_ms': percentile(values, 0.5), 'p95_ms': percentile(values, 0.95), 'max_ms': max(values)}
+                for metric, values in histograms.items() if values}
+
+    def chrome_trace(self, other_data=None):
+        """Eventos no formato JSON do Chrome trace (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            thread_names = dict(self._thread_names)
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}} for tid, name in thread_names.items()]
+        events.extend({'name': name, 'cat': 'pokedex', 'ph': 'X', 'pid': pid, 'tid': tid,
+                       'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6, 'args': args}
+                      for name, start, end, tid, args in spans)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'histograms': self.summary(), **(other_data or {})}}
+
+    def export(self, path, other_data=None):
+        """Grava o trace em disco de forma atômica e retorna o caminho."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(other_data), f, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+class HttpClient:
+    """Cliente HTTP compartilhado: sessão com keep-alive, retentativas e limite de conexões por host."""
+    def __init__(self, timeout=HTTP_TIMEOUT, max_per_host=HTTP_MAX_PER_HOST, retries=HTTP_RETRIES, recorder=None):
+        self.timeout = timeout
+        self.recorder = recorder
+        self.max_per_host = max_per_host
+        retry = Retry(
+            total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_per_host, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def get(self, url, timeout=None, token=None, **kwargs):
+        """GET pela sessão compartilhada, respeitando o limite de requisições simultâneas por host.
+
+        Com token, a espera pela vaga e o download (lido em blocos) são abortados assim que ele for cancelado.
+        A espera pelos cabeçalhos não pode ser interrompida: ela só termina com a resposta ou com o timeout.
+        """
+        if self.recorder is None: return self._get(url, timeout, token, **kwargs)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._get(url, timeout, token, **kwargs)
+            return response
+        finally:
+            # elapsed vai do envio até os cabeçalhos: inclui DNS, TLS e espera do servidor, mas não o corpo.
+            self.recorder.record('http', start, time.perf_counter(), url=url,
+                                 status=response.status_code if response is not None else None,
+                                 headers_ms=response.elapsed.total_seconds() * 1000 if response is not None else None)
+
+    def _get(self, url, timeout, token, **kwargs):
+        slot = self._host_slot(url)
+        if token is None:
+            with slot:
+                return self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+        while not slot.acquire(timeout=CANCEL_POLL_INTERVAL):
+            token.raise_if_cancelled()
+        try:
+            token.raise_if_cancelled()
+            response = self.session.get(url, timeout=timeout or self.timeout, stream=True, **kwargs)
+            try:
+                chunks = []
+                for chunk in response.iter_content(HTTP_CHUNK_SIZE):
+                    token.raise_if_cancelled()
+                    chunks.append(chunk)
+                response._content = b"".join(chunks)
+            finally:
+                response.close()
+            return response
+        finally:
+            slot.release()
+
+class OperationCancelled(Exception):
+    """Operação abandonada porque o usuário já pediu outra coisa."""
+
+class CancelToken:
+    """Sinal de cancelamento compartilhado pelas etapas de uma operação (fila, rede, decodificação)."""
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set(): raise OperationCancelled()
+
+class FlightToken(CancelToken):
+    """Token de uma execução compartilhada: só conta como cancelado quando todos os que a aguardam desistiram.
+
+    Quem entra sem token nunca desiste, então a execução vai até o fim.
+    """
+    def __init__(self):
+        super().__init__()
+        self._tokens = []
+        self._uncancellable = False
+        self._join_lock = threading.Lock()
+
+    def join(self, token):
+        with self._join_lock:
+            if token is None: self._uncancellable = True
+            else: self._tokens.append(token)
+
+    @property
+    def waiters(self):
+        with self._join_lock:
+            return len(self._tokens) + self._uncancellable
+
+    @property
+    def cancelled(self):
+        if self._event.is_set(): return True
+        with self._join_lock:
+            if self._uncancellable or not all(token.cancelled for token in self._tokens): return False
+        self._event.set()
+        return True
+
+    def raise_if_cancelled(self):
+        if self.cancelled: raise OperationCancelled()
+
+class SingleFlight:
+    """Faz chamadas simultâneas com a mesma chave compartilharem uma única execução em andamento."""
+    def __init__(self):
+        self.saved_calls = 0
+        self.saved_by_kind = defaultdict(int)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, token=None, **kwargs):
+        """Executa func(*args, token=..., **kwargs) ou espera a execução já em andamento para key.
+
+        A execução recebe um FlightToken próprio, cancelado só quando todos os que a aguardam
+        (o líder inclusive) cancelaram os seus; assim, trocar uma busca por outra do mesmo
+        recurso não aborta o que a nova está esperando. Quem espera para de esperar quando o
+        próprio token é cancelado; se a execução foi abortada, quem ainda quer o resultado tenta de novo.
+        """
+        while True:
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = (Future(), FlightToken())
+                else:
+                    self.saved_calls += 1
+                    self.saved_by_kind[key[0]] += 1
+                future, flight_token = flight
+                flight_token.join(token)
+            if leader: break
+            try:
+                return self._wait(future, token)
+            except OperationCancelled:
+                if token: token.raise_if_cancelled()
+                continue
+        try:
+            result = func(*args, token=flight_token, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _wait(self, future, token):
+        if token is None: return future.result()
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL_INTERVAL)
+            except FutureTimeout:
+                token.raise_if_cancelled()
+
+class PriorityWorkerPool:
+    """Pool fixo de threads que executa tarefas por ordem de prioridade (menor valor primeiro)."""
+    def __init__(self, workers, name="pokedex-worker"):
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._threads = [threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, priority, func, *args, is_stale=None):
+        """Enfileira uma tarefa; se is_stale() for verdadeiro quando ela sair da fila, é descartada."""
+        self._queue.put((priority, next(self._counter), func, args, is_stale))
+
+    def _worker(self):
+        while True:
+            _, _, func, args, is_stale = self._queue.get()
+            try:
+                if is_stale is None or not is_stale():
+                    func(*args)
+            except Exception as e:
+                print(f"Erro em tarefa de segundo plano: {e}")
+            finally:
+                self._queue.task_done()
+
+class ApiCache:
+    """Cache persistente (SQLite) das respostas da API, com TTL por entrada e despejo LRU."""
+    def __init__(self, path, max_bytes=API_CACHE_MAX_BYTES, default_ttl=API_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Acessos (para o LRU) ficam em memória e vão ao disco em lote, para uma leitura não custar um commit.
+        self._pending_access = {}
+        self._last_access_flush = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Com WAL, NORMAL só sincroniza nos checkpoints: um cache pode perder as últimas gravações numa queda, não se corromper.
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        except (OSError, sqlite3.Error) as e:
+            print(f"Não foi possível abrir o cache em disco '{path}': {e}. Usando cache em memória.")
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "url TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+            "expires_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, url):
+        """Retorna a entrada guardada para a URL (mesmo expirada) ou None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._pending_access[url] = now
+            if (len(self._pending_access) >= API_CACHE_ACCESS_FLUSH_BATCH
+                    or time.monotonic() - self._last_access_flush >= API_CACHE_ACCESS_FLUSH_INTERVAL):
+                self._flush_access()
+                self._conn.commit()
+            fresh = row[3] > now
+            if fresh: self.hits += 1
+            else: self.misses += 1
+        return {'body': row[0], 'etag': row[1], 'last_modified': row[2], 'fresh': fresh}
+
+    def put(self, url, body, etag=None, last_modified=None, ttl=None):
+        """Guarda a resposta bruta e despeja as entradas menos usadas se o orçamento for excedido."""
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            self._pending_access.pop(url, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url, body, etag, last_modified, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, expires_at, now, len(body)))
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes: self._flush_access()
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url, ttl=None):
+        """Renova o TTL de uma entrada revalidada pelo servidor (304)."""
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._pending_access.pop(url, None)
+            self._conn.execute("UPDATE entries SET expires_at = ?, last_access = ? WHERE url = ?", (expires_at, now, url))
+            self._conn.commit()
+
+    def _flush_access(self):
+        if self._pending_access:
+            self._conn.executemany("UPDATE entries SET last_access = ? WHERE url = ?",
+                                   [(accessed, url) for url, accessed in self._pending_access.items()])
+            self._pending_access.clear()
+        self._last_access_flush = time.monotonic()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT url, size FROM entries ORDER BY last_access LIMIT 32").fetchall()
+            if not rows: break
+            for url, size in rows:
+                self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes: break
+
+def catalog_entry(poke_id, name):
+    return {'id': poke_id, 'name': name, 'url': f"{POKEAPI_BASE_URL}/pokemon/{poke_id}/"}
+
+def parse_catalog(results):
+    """Converte a listagem da API em entradas do catálogo, com o id já extraído da URL."""
+    return [catalog_entry(int(result['url'].rstrip('/').rsplit('/', 1)[-1]), result['name']) for result in results]
+
+def load_catalog_snapshot(path=CATALOG_SNAPSHOT_PATH):
+    """Lê o catálogo salvo em disco; retorna (total, entradas) ou (0, []) se não houver cópia válida."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        return snapshot['count'], [catalog_entry(poke_id, name) for poke_id, name in snapshot['pokemon']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0, []
+
+def save_catalog_snapshot(count, entries, path=CATALOG_SNAPSHOT_PATH):
+    """Grava o catálogo de forma compacta ([id, nome]) e atômica."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'count': count, 'pokemon': [[e['id'], e['name']] for e in entries]}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Não foi possível salvar o catálogo local: {e}")
+
+def grid_sprite_url(poke_id):
+    return f"{SPRITES_BASE_URL}/{poke_id}.png"
+
+def image_sources(sprites, shiny=False):
+    """Fontes de imagem da tela de detalhes em ordem de preferência: GIF animado, artwork oficial e sprite."""
+    key = 'front_shiny' if shiny else 'front_default'
+    sources = []
+    try:
+        if url := sprites['versions']['generation-v']['black-white']['animated'][key]:
+            sources.append({'type': 'gif', 'url': url})
+    except (KeyError, TypeError): pass
+    try:
+        if url := sprites['other']['official-artwork'][key]:
+            sources.append({'type': 'artwork', 'url': url})
+    except (KeyError, TypeError): pass
+    if url := (sprites or {}).get(key):
+        sources.append({'type': 'sprite', 'url': url})
+    return sources
+
+def bounded_edit_distance(a, b, max_distance):
+    """Distância de Levenshtein entre a e b, ou None se passar de max_distance."""
+    if abs(len(a) - len(b)) > max_distance: return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance: return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+class ImageCache:
+    """Cache de imagens em dois níveis: LRU em memória de imagens decodificadas por (URL, tamanho) e bytes brutos em disco."""
+    def __init__(self, download, disk, offline_store=None, memory_budget=IMAGE_MEMORY_BUDGET, single_flight=None):
+        self.download = download
+        self.disk = disk
+        self.offline_store = offline_store
+        self.single_flight = single_flight or SingleFlight()
+        self.memory_budget = memory_budget
+        self.memory_hits = 0
+        self.memory_misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_bytes(self, url, token=None):
+        """Bytes brutos da imagem: armazenamento offline, depois disco, depois rede."""
+        if self.offline_store:
+            body = self.offline_store.get(url)
+            if body is not None: return body
+        entry = self.disk.get(url)
+        if entry and entry['fresh']: return entry['body']
+        try:
+            return self.single_flight.do(('bytes', url), self._download_to_disk, url, token=token)
+        except requests.RequestException:
+            # Vencido o IMAGE_DISK_TTL a imagem é baixada de novo, mas sem rede a cópia antiga ainda serve.
+            if entry: return entry['body']
+            raise
+
+    def _download_to_disk(self, url, token):
+        body = self.download(url, token)
+        self.disk.put(url, body)
+        return body
+
+    def peek(self, url, size=None):
+        """Imagem já decodificada em memória, sem acessar disco nem rede."""
+        with self._lock:
+            image = self._memory.get((url, size))
+            if image is not None:
+                self._memory.move_to_end((url, size))
+                self.memory_hits += 1
+            return image
+
+    def get(self, url, size=None, scale=None, token=None):
+        """Imagem RGBA decodificada; com size, reduzida (LANCZOS) para caber na caixa; com scale, ampliada."""
+        key = size if scale is None else ('scale', scale)
+        image = self.peek(url, key)
+        if image is not None: return image
+        with self._lock:
+            self.memory_misses += 1
+        return self.single_flight.do(('image', url, key), self._decode, url, size, scale, key, token=token)
+
+    def _decode(self, url, size, scale, key, token):
+        data = self.get_bytes(url, token)
+        if token: token.raise_if_cancelled()
+        image = Image.open(BytesIO(data)).convert("RGBA")
+        if size: image.thumbnail(size, Image.Resampling.LANCZOS)
+        if scale: image = image.resize((round(image.width * scale), round(image.height * scale)))
+        self._remember((url, key), image)
+        return image
+
+    def _remember(self, key, image):
+        cost = image.width * image.height * 4
+        with self._lock:
+            if key in self._memory: return
+            self._memory[key] = image
+            self._memory_bytes += cost
+            while self._memory_bytes > self.memory_budget and len(self._memory) > 1:
+                _, old = self._memory.popitem(last=False)
+                self._memory_bytes -= old.width * old.height * 4
+
+    def stats(self):
+        return {
+            'memory_hits': self.memory_hits, 'memory_misses': self.memory_misses,
+            'memory_entries': len(self._memory), 'memory_bytes': self._memory_bytes,
+            'disk_hits': self.disk.hits, 'disk_misses': self.disk.misses,
+        }
+
+class GifAnimation:
+    """Quadros de um GIF já escalados, decodificados sob demanda e compartilhados entre exibições."""
+    def __init__(self, data, pixel_scale):
+        self.pixel_scale = pixel_scale
+        self._source = Image.open(BytesIO(data))
+        self.frame_count = getattr(self._source, 'n_frames', 1)
+        self.frames = []
+        self._lock = threading.Lock()
+
+    @property
+    def complete(self):
+        return len(self.frames) >= self.frame_count
+
+    def decode_next(self):
+        """Decodifica e escala o próximo quadro; retorna False quando não há mais quadros."""
+        with self._lock:
+            index = len(self.frames)
+            if index >= self.frame_count: return False
+            try:
+                self._source.seek(index)
+                frame = self._source.convert("RGBA")
+            except (EOFError, OSError, ValueError):
+                self.frame_count = index
+                return False
+            display_size = (frame.width * GIF_SCALE, frame.height * GIF_SCALE)
+            pixels = frame.resize((round(display_size[0] * self.pixel_scale), round(display_size[1] * self.pixel_scale)))
+            self.frames.append((pixels, display_size, self._source.info.get('duration', 100)))
+            if self.complete:
+                self._source.close()
+            return True
+
+class AnimationCache:
+    """LRU das animações GIF por (URL, escala), para reexibir o mesmo sprite sem decodificá-lo de novo."""
+    def __init__(self, load_bytes, max_entries=ANIMATION_CACHE_SIZE):
+        self.load_bytes = load_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url, pixel_scale, token=None):
+        key = (url, pixel_scale)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        animation = GifAnimation(self.load_bytes(url, token), pixel_scale)
+        with self._lock:
+            animation = self._entries.setdefault(key, animation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return animation
+
+class OfflineStore:
+    """Espelho local (SQLite) dos recursos da PokeAPI e dos sprites, preenchido pela sincronização offline.
+
+    Os corpos são guardados comprimidos (zlib) quando isso economiza espaço; imagens, já comprimidas, ficam como estão.
+    Cada gravação incrementa a revisão (em sync_state), que os índices derivados usam para saber se estão em dia.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._batch_depth = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Não foi possível abrir o armazenamento offline '{path}': {e}.")
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS resources (url TEXT PRIMARY KEY, body BLOB NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Armazenamentos anteriores à compressão ganham a coluna; os corpos antigos continuam legíveis.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(resources)")}
+        if 'compressed' not in columns:
+            self._conn.execute("ALTER TABLE resources ADD COLUMN compressed INTEGER NOT NULL DEFAULT 0")
+        # Armazenamentos anteriores à revisão começam na 0, que ainda não foi indexada.
+        self._conn.execute("INSERT OR IGNORE INTO sync_state (key, value) VALUES ('revision', 0)")
+        self._conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT body, compressed FROM resources WHERE url = ?", (url,)).fetchone()
+        if not row: return None
+        return zlib.decompress(row[0]) if row[1] else row[0]
+
+    def has(self, url):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM resources WHERE url = ?", (url,)).fetchone() is not None
+
+    def put(self, url, body):
+        packed = zlib.compress(body)
+        compressed = len(packed) < len(body) * 0.9
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO resources (url, body, compressed) VALUES (?, ?, ?)",
+                               (url, packed if compressed else body, int(compressed)))
+            self._conn.execute("UPDATE sync_state SET value = value + 1 WHERE key = 'revision'")
+            if not self._batch_depth: self._conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa as gravações do bloco numa única transação (um commit por Pokémon na sincronização)."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth: self._conn.commit()
+
+    def revision(self):
+        """Revisão atual do conteúdo guardado."""
+        return self.get_state('revision')
+
+    def get_state(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(value)))
+            if not self._batch_depth: self._conn.commit()
+
+class OfflineSync:
+    """Sincronização em lote, retomável e com limite de taxa, de todo o catálogo para o OfflineStore."""
+    def __init__(self, http, store, min_interval=SYNC_MIN_INTERVAL, stop_event=None):
+        self.http = http
+        self.store = store
+        self.min_interval = min_interval
+        self.stop_event = stop_event or threading.Event()
+        self._last_request = 0.0
+
+    def _download(self, url, refresh=False):
+        """Baixa e guarda a URL, a menos que ela já esteja no armazenamento (ou refresh seja pedido)."""
+        body = self.store.get(url)
+        if body is not None and not refresh: return body
+        wait = self._last_request + self.min_interval - time.monotonic()
+        if wait > 0: time.sleep(wait)
+        self._last_request = time.monotonic()
+        try:
+            response = self.http.get(url)
+            response.raise_for_status()
+        except requests.RequestException:
+            if body is not None: return body
+            raise
+        self.store.put(url, response.content)
+        return response.content
+
+    def _sync_pokemon(self, name):
+        pokemon = json.loads(self._download(f"{POKEAPI_BASE_URL}/pokemon/{name}"))
+        species = json.loads(self._download(pokemon['species']['url']))
+        self._download(species['evolution_chain']['url'])
+        self._download(pokemon['location_area_encounters'])
+        self._download(grid_sprite_url(pokemon['id']))
+        for shiny in (False, True):
+            # Só a primeira fonte disponível é usada pela tela de detalhes.
+            sources = image_sources(pokemon.get('sprites', {}), shiny)
+            if sources: self._download(sources[0]['url'])
+
+    def run(self, progress=None):
+        """Percorre o catálogo a partir do último ponto salvo. Retorna os nomes que falharam."""
+        catalog = json.loads(self._download(OFFLINE_CATALOG_URL, refresh=True))['results']
+        start = int(self.store.get_state('position', 0))
+        failed = []
+        for position in range(start, len(catalog)):
+            if self.stop_event.is_set(): return failed
+            name = catalog[position]['name']
+            # Os recursos de um Pokémon e a posição salva entram juntos, num único commit.
+            with self.store.batch():
+                try:
+                    self._sync_pokemon(name)
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    print(f"Falha ao sincronizar '{name}': {e}")
+                    failed.append(name)
+                self.store.set_state('position', position + 1)
+            if progress: progress(position + 1, len(catalog), name)
+        # Ciclo completo: a próxima execução recomeça do início, pulando o que já foi guardado.
+        self.store.set_state('position', 0)
+        return failed
+
+class PokemonIndex:
+    """Índice do catálogo construído uma vez: por id, por prefixo, por substring (n-gramas) e aproximado."""
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_id = {}
+        self._position = {}
+        self._ngrams = defaultdict(set)
+        for position, entry in enumerate(entries):
+            name = entry['name']
+            self.by_id[entry['id']] = entry
+            self._position[name] = position
+            for size in range(1, NGRAM_SIZE + 1):
+                for start in range(len(name) - size + 1):
+                    self._ngrams[name[start:start + size]].add(position)
+        self._sorted_names = sorted(self._position)
+
+    def lookup_id(self, poke_id):
+        return self.by_id.get(int(poke_id))
+
+    def prefix(self, term):
+        """Posições do catálogo cujos nomes começam com term."""
+        start = bisect.bisect_left(self._sorted_names, term)
+        end = bisect.bisect_left(self._sorted_names, term + "\uffff")
+        return sorted(self._position[name] for name in self._sorted_names[start:end])
+
+    def substring(self, term):
+        """Posições do catálogo cujos nomes contêm term."""
+        if len(term) <= NGRAM_SIZE:
+            return sorted(self._ngrams.get(term, ()))
+        grams = [term[i:i + NGRAM_SIZE] for i in range(len(term) - NGRAM_SIZE + 1)]
+        candidates = set.intersection(*(self._ngrams.get(gram, set()) for gram in grams))
+        return sorted(p for p in candidates if term in self.entries[p]['name'])
+
+    def fuzzy(self, term, max_distance=FUZZY_MAX_DISTANCE):
+        """Posições dos nomes a até max_distance edições de term, dos mais próximos aos mais distantes."""
+        scored = []
+        for position, entry in enumerate(self.entries):
+            distance = bounded_edit_distance(term, entry['name'], max_distance)
+            if distance is not None:
+                scored.append((distance, position))
+        return [position for _, position in sorted(scored)]
+
+    def refine(self, previous_matches, term):
+        """Filtra resultados de um termo anterior (prefixo de term) sem varrer o catálogo de novo."""
+        def rank(entry):
+            name = entry['name']
+            group = 0 if name == term else 1 if name.startswith(term) else 2
+            return group, self._position[name]
+        return sorted((entry for entry in previous_matches if term in entry['name']), key=rank)
+
+    def search(self, term):
+        """Resultados ordenados: id exato, nome exato, prefixo, substring e, sem nenhum desses, aproximados."""
+        if term.isdigit():
+            entry = self.lookup_id(term)
+            return [entry] if entry else []
+        ranked, seen = [], set()
+        groups = [[self._position[term]] if term in self._position else [], self.prefix(term), self.substring(term)]
+        for group in groups:
+            for position in group:
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+        if not ranked and len(term) > FUZZY_MAX_DISTANCE + 1:
+            ranked = self.fuzzy(term)
+        return [self.entries[position] for position in ranked]
+
+QUERY_TOKEN = re.compile(r"^([a-z_-]+)(<=|>=|<|>|=|:)(.+)$")
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "=": operator.eq, ":": operator.eq}
+
+def parse_query(term):
+    """Divide uma consulta estruturada ("type:fire speed>100 sort:total") em (chave, operador, valor).
+
+    Retorna None se o termo não for uma consulta, para ele seguir como busca por nome.
+    """
+    tokens = term.split()
+    matches = [QUERY_TOKEN.match(token) for token in tokens]
+    if not tokens or not all(matches): return None
+    return [match.groups() for match in matches]
+
+def stats_filters(query):
+    """Argumentos de StatsTable.query para os termos de tipo, atributo e ordenação; ValueError se algum for inválido."""
+    filters = {'types': [], 'conditions': [], 'sort': None, 'descending': True}
+    for key, op, value in query:
+        if key == "type" and op == ":":
+            if value not in TYPE_NAMES: raise ValueError(f"tipo desconhecido: {value}")
+            filters['types'].append(value)
+        elif key == "sort" and op == ":":
+            field = STAT_ALIASES.get(value.lstrip("+-"))
+            if field is None: raise ValueError(f"ordenação desconhecida: {value}")
+            filters['sort'] = field
+            # Atributos vêm do maior para o menor, a não ser que o valor comece com "+"; o id é crescente.
+            filters['descending'] = value.startswith("-") or (field != "id" and not value.startswith("+"))
+        elif key in STAT_ALIASES:
+            filters['conditions'].append((STAT_ALIASES[key], op, int(value)))
+        else:
+            raise ValueError(f"filtro desconhecido: {key}")
+    return filters
+
+class StatsTable:
+    """Tabela colunar (array estruturado do NumPy) com id, tipos e atributos base, gravada em .npy e mapeada do disco.
+
+    As linhas são preenchidas conforme os detalhes de cada Pokémon chegam (ou da sincronização offline).
+    """
+    DTYPE = None if np is None else np.dtype(
+        [('id', '<i4'), ('type1', 'i1'), ('type2', 'i1')] + [(field, '<u2') for field in STAT_FIELDS] + [('total', '<u2'), ('loaded', '?')])
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = None
+        self._lock = threading.Lock()
+        if np is None: return
+        try:
+            rows = np.load(path, mmap_mode='r+')
+            if rows.dtype == self.DTYPE: self.rows = rows
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Não foi possível abrir a tabela de atributos '{path}': {e}.")
+
+    @property
+    def available(self):
+        return np is not None
+
+    def _row(self, poke_id):
+        if self.rows is None or not len(self.rows): return None
+        index = int(np.searchsorted(self.rows['id'], poke_id))
+        return index if index < len(self.rows) and self.rows['id'][index] == poke_id else None
+
+    def sync_ids(self, ids):
+        """Garante uma linha por id, mantendo os atributos já carregados; só regrava o arquivo se algo mudou."""
+        if np is None: return
+        with self._lock:
+            self._add_ids(np.fromiter((int(poke_id) for poke_id in ids), dtype='<i4'))
+
+    def _add_ids(self, ids):
+        # Cópia, não visão: nenhuma referência ao arquivo mapeado pode sobrar quando _store for substituí-lo.
+        current = np.array(self.rows['id']) if self.rows is not None else np.empty(0, dtype='<i4')
+        wanted = np.union1d(current, ids)
+        if len(wanted) == len(current): return
+        rows = np.zeros(len(wanted), dtype=self.DTYPE)
+        rows['id'] = wanted
+        rows['type1'] = rows['type2'] = -1
+        if len(current): rows[np.searchsorted(wanted, current)] = self.rows
+        self._store(rows)
+
+    def _release(self):
+        """Fecha o mapeamento atual do arquivo (o Windows não deixa substituir um arquivo mapeado)."""
+        rows, self.rows = self.rows, None
+        if isinstance(rows, np.memmap): rows.flush()
+        mapping = getattr(rows, '_mmap', None)
+        del rows
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # Ainda há visões vivas; o mapeamento é fechado quando elas forem coletadas.
+
+    def _store(self, rows):
+        self._release()
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, rows)
+            os.replace(tmp_path, self.path)
+            self.rows = np.load(self.path, mmap_mode='r+')
+        except OSError as e:
+            print(f"Não foi possível gravar a tabela de atributos: {e}. Usando só a memória.")
+            self.rows = rows
+
+    def update(self, pokemon_data, flush=True):
+        """Preenche a linha de um Pokémon a partir do JSON da API."""
+        if np is None: return
+        poke_id = pokemon_data['id']
+        types = [t['type']['name'] for t in sorted(pokemon_data['types'], key=lambda t: t['slot'])]
+        codes = [TYPE_NAMES.index(name) if name in TYPE_NAMES else -1 for name in types[:2]] + [-1, -1]
+        base = {stat['stat']['name'].replace('-', '_'): stat['base_stat'] for stat in pokemon_data['stats']}
+        stats = [base.get(field, 0) for field in STAT_FIELDS]
+        with self._lock:
+            if self._row(poke_id) is None: self._add_ids(np.array([poke_id], dtype='<i4'))
+            self.rows[self._row(poke_id)] = (poke_id, codes[0], codes[1], *stats, sum(stats), True)
+            if flush: self.flush()
+
+    def flush(self):
+        if isinstance(self.rows, np.memmap): self.rows.flush()
+
+    def loaded_count(self):
+        return 0 if self.rows is None else int(np.count_nonzero(self.rows['loaded']))
+
+    def query(self, types=(), conditions=(), sort=None, descending=True):
+        """Ids dos Pokémon carregados que têm todos os tipos e atendem às condições, ordenados por sort (ou id)."""
+        with self._lock:
+            if self.rows is None: return []
+            rows = self.rows
+            mask = rows['loaded'].copy()
+            for type_name in types:
+                code = TYPE_NAMES.index(type_name)
+                mask &= (rows['type1'] == code) | (rows['type2'] == code)
+            for field, op, value in conditions:
+                mask &= COMPARISONS[op](rows[field], value)
+            selected = np.array(rows[mask])
+        if sort:
+            keys = selected[sort].astype('<i4')
+            selected = selected[np.argsort(-keys if descending else keys, kind='stable')]
+        return selected['id'].tolist()
+
+def resource_id(url):
+    """Id numérico no fim de uma URL da PokeAPI (ex.: .../evolution-chain/67/ -> 67)."""
+    return int(urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1])
+
+def parse_evolution_chain(chain_data):
+    """Percorre a árvore evolutiva inteira, com todos os ramos, em largura.
+
+    Cada membro traz o id de quem evolui para ele ('parent') e o estágio (0 para a forma base).
+    """
+    chain = []
+    pending = deque([(chain_data, None, 0)])
+    while pending:
+        current, parent_id, stage = pending.popleft()
+        species_id = resource_id(current['species']['url'])
+        chain.append({'name': current['species']['name'], 'id': species_id, 'parent': parent_id, 'stage': stage})
+        pending.extend((child, species_id, stage + 1) for child in current['evolves_to'])
+    return chain
+
+class EvolutionGraph:
+    """Famílias evolutivas indexadas pelo id da espécie; cada cadeia é baixada e processada uma única vez.
+
+    Todo membro de uma família já carregada é resolvido sem novas requisições, e as consultas
+    "de quem evolui" / "em quem evolui" são buscas diretas em dicionário.
+    """
+    def __init__(self):
+        self.members = {}
+        self.children = defaultdict(list)
+        self.chain_of = {}
+        self.chains = {}
+        self._lock = threading.Lock()
+
+    def has_chain(self, chain_id):
+        with self._lock:
+            return chain_id in self.chains
+
+    def add_chain(self, chain_id, chain_data):
+        members = parse_evolution_chain(chain_data)
+        with self._lock:
+            if chain_id in self.chains: return
+            for member in members:
+                self.members[member['id']] = member
+                self.chain_of[member['id']] = chain_id
+                if member['parent'] is not None: self.children[member['parent']].append(member['id'])
+            self.chains[chain_id] = [member['id'] for member in members]
+
+    def family(self, species_id):
+        """Todos os membros da família de species_id, da forma base aos ramos finais ([] se a cadeia não foi carregada)."""
+        with self._lock:
+            chain_id = self.chain_of.get(species_id)
+            return [self.members[member_id] for member_id in self.chains.get(chain_id, [])]
+
+    def stages(self, species_id):
+        """A família agrupada por estágio: uma lista de membros por coluna da exibição."""
+        columns = []
+        for member in self.family(species_id):
+            if member['stage'] == len(columns): columns.append([])
+            columns[member['stage']].append(member)
+        return columns
+
+    def evolves_from(self, species_id):
+        with self._lock:
+            member = self.members.get(species_id)
+            return self.members[member['parent']] if member and member['parent'] is not None else None
+
+    def evolves_into(self, species_id):
+        with self._lock:
+            return [self.members[child_id] for child_id in self.children.get(species_id, [])]
+
+def parse_pokemon_name(species_data, fallback_name):
+    """Extrai o nome em PT-BR, com fallback para o nome original."""
+    for name_info in species_data.get('names', []):
+        if name_info.get('language', {}).get('name') == 'pt':
+            return name_info['name']
+    return fallback_name.replace('-', ' ').title()
+
+def parse_flavor_text(species_data):
+    """Extrai a descrição da Pokédex, priorizando PT e usando EN como fallback."""
+    pt_text = None
+    en_text = None
+    for entry in species_data.get('flavor_text_entries', []):
+        lang_name = entry.get('language', {}).get('name')
+        if lang_name == 'pt':
+            pt_text = entry['flavor_text'].replace('\n', ' ').replace('\f', ' ')
+            break
+        elif lang_name == 'en' and en_text is None:
+            en_text = entry['flavor_text'].replace('\n', ' ').replace('\f', ' ')
+    return pt_text or en_text or "Nenhuma descrição disponível."
+
+def format_area_name(area):
+    return area.replace('-', ' ').replace('route', 'rota').title()
+
+def format_version_name(version):
+    return version.replace('-', ' ').title()
+
+def encounter_pairs(encounter_data):
+    """Pares (versão, área), com os nomes da API, da lista de encontros de um Pokémon."""
+    return {(version_details['version']['name'], encounter['location_area']['name'])
+            for encounter in encounter_data or [] for version_details in encounter['version_details']}
+
+class EncounterIndex:
+    """Índice invertido (SQLite) dos encontros: (versão, área) -> ids e id -> {versão: áreas}.
+
+    Versões e áreas são guardadas uma única vez e referenciadas por inteiros, o que mantém o arquivo compacto.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Não foi possível abrir o índice de locais '{path}': {e}.")
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS versions (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS areas (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS encounters (
+                version_id INTEGER NOT NULL, area_id INTEGER NOT NULL, pokemon_id INTEGER NOT NULL,
+                PRIMARY KEY (version_id, area_id, pokemon_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS encounters_by_area ON encounters (area_id);
+            CREATE INDEX IF NOT EXISTS encounters_by_pokemon ON encounters (pokemon_id);
+            CREATE TABLE IF NOT EXISTS indexed (pokemon_id INTEGER PRIMARY KEY);
+        """)
+        self._names = {table: dict(self._conn.execute(f"SELECT name, id FROM {table}")) for table in ('versions', 'areas')}
+
+    def _intern(self, table, name):
+        ids = self._names[table]
+        if name not in ids:
+            ids[name] = self._conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid
+        return ids[name]
+
+    def has(self, pokemon_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM indexed WHERE pokemon_id = ?", (pokemon_id,)).fetchone() is not None
+
+    def add(self, pokemon_id, encounter_data, commit=True):
+        """Indexa (ou reindexa) os encontros de um Pokémon; uma lista vazia também fica registrada."""
+        pairs = encounter_pairs(encounter_data)
+        with self._lock:
+            rows = [(self._intern('versions', version), self._intern('areas', area), pokemon_id) for version, area in pairs]
+            self._conn.execute("DELETE FROM encounters WHERE pokemon_id = ?", (pokemon_id,))
+            self._conn.executemany("INSERT OR IGNORE INTO encounters (version_id, area_id, pokemon_id) VALUES (?, ?, ?)", rows)
+            self._conn.execute("INSERT OR IGNORE INTO indexed (pokemon_id) VALUES (?)", (pokemon_id,))
+            if commit: self._conn.commit()
+
+    def indexed_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM indexed").fetchone()[0]
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def locations(self, pokemon_id):
+        """Locais de um Pokémon agrupados por versão, com nomes prontos para exibição."""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT versions.name, areas.name FROM encounters
+                JOIN versions ON versions.id = encounters.version_id JOIN areas ON areas.id = encounters.area_id
+                WHERE encounters.pokemon_id = ?""", (pokemon_id,)).fetchall()
+        locations_by_version = defaultdict(set)
+        for version, area in rows:
+            locations_by_version[format_version_name(version)].add(format_area_name(area))
+        return {version: sorted(areas) for version, areas in locations_by_version.items()}
+
+    def pokemon_at(self, area=None, version=None):
+        """Ids dos Pokémon encontrados na área e/ou versão pedidas.
+
+        A área casa com trechos inteiros do nome da API ("route-1" encontra "kanto-route-1-area", mas não "route-10");
+        "rota" é aceito no lugar de "route", como na exibição.
+        """
+        clauses, params = [], []
+        with self._lock:
+            if area:
+                slug = "-" + re.sub(r"[^a-z0-9-]", "", area.lower().replace(" ", "-").replace("rota", "route")) + "-"
+                area_ids = [area_id for name, area_id in self._names['areas'].items() if slug in f"-{name}-"]
+                if not area_ids: return []
+                clauses.append(f"area_id IN ({', '.join('?' * len(area_ids))})")
+                params.extend(area_ids)
+            if version:
+                version_id = self._names['versions'].get(version.lower().replace(" ", "-"))
+                if version_id is None: return []
+                clauses.append("version_id = ?")
+                params.append(version_id)
+            where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+            rows = self._conn.execute(f"SELECT DISTINCT pokemon_id FROM encounters{where} ORDER BY pokemon_id", params).fetchall()
+        return [row[0] for row in rows]
+
+def summarize_details(details):
+    """Resumo serializável em JSON dos detalhes de um Pokémon: tipos, atributos, evolução e locais."""
+    data = details['data']
+    stats = {stat['stat']['name']: stat['base_stat'] for stat in data['stats']}
+    return {
+        'status': 'ok', 'id': data['id'], 'name': data['name'], 'pt_name': details['pt_name'],
+        'types': [t['type']['name'] for t in data['types']], 'stats': stats, 'total': sum(stats.values()),
+        'evolution_chain': [member['name'] for member in details['evolution_chain']], 'locations': details['locations'],
+    }
+
+class PokedexService:
+    """Motor de dados sem interface: a API síncrona pode ser chamada de qualquer thread e as variantes *_async
+    rodam o mesmo código em asyncio.to_thread."""
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.catalog_path = os.path.join(cache_dir, os.path.basename(CATALOG_SNAPSHOT_PATH))
+        self.perf = PerfRecorder()
+        self.http = HttpClient(recorder=self.perf)
+        self.single_flight = SingleFlight()
+        self.api_cache = ApiCache(os.path.join(cache_dir, "api_cache.sqlite3"))
+        self.offline_store = OfflineStore(os.path.join(cache_dir, "offline.sqlite3"))
+        image_disk = ApiCache(os.path.join(cache_dir, "images.sqlite3"), max_bytes=IMAGE_DISK_MAX_BYTES, default_ttl=IMAGE_DISK_TTL)
+        self.image_cache = ImageCache(self._download_bytes, image_disk, self.offline_store, single_flight=self.single_flight)
+        self.animation_cache = AnimationCache(self.fetch_bytes)
+        self.detail_executor = ThreadPoolExecutor(max_workers=HTTP_MAX_PER_HOST, thread_name_prefix="pokedex-detail")
+        self.prefetch_pool = PriorityWorkerPool(1, name="pokedex-prefetch")
+        self.prefetch_tokens = {}
+        self.catalog = []
+        self.catalog_count = 0
+        self.index = None
+        self.stats_table = StatsTable(os.path.join(cache_dir, "stats.npy"))
+        self.evolution_graph = EvolutionGraph()
+        self.encounter_index = EncounterIndex(os.path.join(cache_dir, "encounters.sqlite3"))
+        self._foreground_lock = threading.Lock()
+        self._foreground_count = 0
+        self.foreground_idle = threading.Event()
+        self.foreground_idle.set()
+
+    def load_cached_catalog(self):
+        """Catálogo salvo em disco na última execução (lista vazia se não houver)."""
+        self.catalog_count, entries = load_catalog_snapshot(self.catalog_path)
+        return entries
+
+    def set_catalog(self, entries):
+        """Instala um catálogo e o índice de busca correspondente."""
+        self.index = PokemonIndex(entries)
+        self.catalog = entries
+        self.stats_table.sync_ids(entry['id'] for entry in entries)
+
+    def _catalog_is_current(self):
+        """Checagem de delta: compara o total e o último Pokémon da API com a cópia local."""
+        if not self.catalog: return False, None
+        response = self.http.get(f"{POKEAPI_BASE_URL}/pokemon?limit=1&offset={self.catalog_count - 1}")
+        response.raise_for_status()
+        page = response.json()
+        last = page['results'][0]['name'] if page['results'] else None
+        return page['count'] == self.catalog_count and last == self.catalog[-1]['name'], page['count']
+
+    def refresh_catalog(self):
+        """Atualiza o catálogo pela rede, baixando a lista completa apenas se ela mudou.
+
+        Retorna as novas entradas sem instalá-las (quem chama escolhe a thread) ou None se nada mudou.
+        """
+        try:
+            is_current, count = self._catalog_is_current()
+            if is_current:
+                print("Catálogo local de Pokémon já está atualizado.")
+                return None
+            response = self.http.get(f"{POKEAPI_BASE_URL}/pokemon?limit={count or 100000}")
+            response.raise_for_status()
+            payload = response.json()
+            entries = parse_catalog(payload['results'])
+            count = payload['count']
+            save_catalog_snapshot(count, entries, self.catalog_path)
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            body = None if self.catalog else self.offline_store.get(OFFLINE_CATALOG_URL)
+            if body is None:
+                print(f"Erro ao atualizar catálogo: {e}")
+                return None
+            entries = parse_catalog(json.loads(body)['results'])
+            count = len(entries)
+        self.catalog_count = count
+        return entries
+
+    def search(self, term):
+        """Busca no catálogo instalado: por nome (id exato, prefixo, trecho e aproximados) ou por consulta estruturada."""
+        query = parse_query(term)
+        if query is None: return self.index.search(term) if self.index else []
+        return self.structured_search(query)
+
+    def structured_search(self, query):
+        """Consulta por tipo, atributos e locais ("type:fire speed>100 sort:total", "area:route-1 version:red").
+
+        Cobre os Pokémon já carregados (ou sincronizados); filtros de local e de atributo podem ser combinados.
+        """
+        places = {key: value for key, _, value in query if key in LOCATION_FILTERS}
+        stats_query = [term for term in query if term[0] not in LOCATION_FILTERS]
+        try:
+            filters = stats_filters(stats_query)
+        except ValueError:
+            return []
+        if not self.index: return []
+        ids = self.encounter_index.pokemon_at(places.get('area'), places.get('version')) if places else None
+        if stats_query or ids is None:
+            if not self.stats_table.available:
+                print("Consultas por tipo e atributo precisam do NumPy instalado.")
+                return []
+            matches = self.stats_table.query(**filters)
+            if ids is not None:
+                allowed = set(ids)
+                matches = [poke_id for poke_id in matches if poke_id in allowed]
+            ids = matches
+        return [entry for entry in map(self.index.lookup_id, ids) if entry]
+
+    def index_offline_store(self):
+        """Preenche a tabela de atributos e o índice de locais com o que já está no armazenamento offline, sem acessar a rede.
+
+        Os nomes vêm do catálogo guardado pela própria sincronização, então funciona sem catálogo instalado (ex.: --sync).
+        Ao terminar, registra a revisão do armazenamento que foi indexada e quantos Pokémon cada índice ficou tendo.
+        """
+        revision = self.offline_store.revision()
+        body = self.offline_store.get(OFFLINE_CATALOG_URL)
+        entries = parse_catalog(json.loads(body)['results']) if body is not None else self.catalog
+        # Todas as linhas de uma vez: um id novo dentro de update() regravaria o .npy inteiro a cada Pokémon.
+        self.stats_table.sync_ids(entry['id'] for entry in entries)
+        for entry in entries:
+            body = self.offline_store.get(f"{POKEAPI_BASE_URL}/pokemon/{entry['name']}")
+            if body is None: continue
+            pokemon_data = json.loads(body)
+            self.stats_table.update(pokemon_data, flush=False)
+            encounters = self.offline_store.get(pokemon_data['location_area_encounters'])
+            if encounters is not None: self.encounter_index.add(pokemon_data['id'], json.loads(encounters), commit=False)
+        self.stats_table.flush()
+        self.encounter_index.commit()
+        for marker, count in self._index_counts().items():
+            self.offline_store.set_state(marker, f"{revision}:{count}")
+
+    def _index_counts(self):
+        counts = {'encounters_indexed': self.encounter_index.indexed_count()}
+        if self.stats_table.available: counts['stats_indexed'] = self.stats_table.loaded_count()
+        return counts
+
+    def reindex_offline_store(self):
+        """Reindexa o armazenamento offline só se ele mudou desde a última indexação, ou se um índice perdeu o que tinha.
+
+        Buscas online só acrescentam Pokémon aos índices; menos do que o registrado significa arquivo apagado ou refeito.
+        """
+        revision = self.offline_store.revision()
+        for marker, count in self._index_counts().items():
+            indexed_revision, _, indexed_count = self.offline_store.get_state(marker, "").partition(':')
+            if indexed_revision != revision or count < int(indexed_count or 0):
+                self.index_offline_store()
+                return
+
+    def _download_bytes(self, url, token=None):
+        response = self.http.get(url, token=token)
+        response.raise_for_status()
+        return response.content
+
+    def fetch_bytes(self, url, token=None):
+        """Bytes de uma imagem, passando pelo armazenamento offline e pelo cache de imagens em disco."""
+        return self.image_cache.get_bytes(url, token)
+
+    def fetch_json(self, url, token=None):
+        """Busca um recurso JSON; pedidos simultâneos para a mesma URL compartilham uma única busca."""
+        return self.single_flight.do(('json', url), self._load_json, url, token=token)
+
+    def _load_json(self, url, token=None):
+        """Busca um recurso JSON no armazenamento offline ou no cache persistente, com revalidação condicional."""
+        body = self.offline_store.get(url)
+        if body is not None: return json.loads(body)
+        entry = self.api_cache.get(url)
+        if entry and entry['fresh']:
+            return json.loads(entry['body'])
+
+        headers = {}
+        if entry:
+            if entry['etag']: headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']: headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            response = self.http.get(url, headers=headers, token=token)
+            if entry and response.status_code == 304:
+                self.api_cache.touch(url)
+                return json.loads(entry['body'])
+            response.raise_for_status()
+        except requests.RequestException:
+            if entry: return json.loads(entry['body'])
+            raise
+
+        self.api_cache.put(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.json()
+
+    def _timed_stage(self, timings, stage, func, *args):
+        """Executa uma etapa da busca registrando o início e o fim dela."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timings[stage] = (start, time.perf_counter())
+
+    def _report_slow_stage(self, pokemon_name, timings, total):
+        if total < SLOW_STAGE_THRESHOLD or not timings: return
+        elapsed_by_stage = {stage: end - start for stage, (start, end) in timings.items()}
+        slowest = max(elapsed_by_stage, key=elapsed_by_stage.get)
+        details = ", ".join(f"{stage}={elapsed:.2f}s" for stage, elapsed in elapsed_by_stage.items())
+        print(f"Busca de '{pokemon_name}' lenta ({total:.2f}s); etapa mais lenta: {slowest} ({details})")
+
+    def get_details(self, pokemon_name, timings=None, token=None, checkpoint=None):
+        """Busca os detalhes de um Pokémon; buscas simultâneas do mesmo nome (cliques repetidos, histórico, pré-carregamento) são unificadas."""
+        if timings is None: timings = {}
+        return self.single_flight.do(('details', pokemon_name), self._fetch_details_uncoalesced, pokemon_name, timings,
+                                     checkpoint=checkpoint, token=token)
+
+    def _fetch_details_uncoalesced(self, pokemon_name, timings, token=None, checkpoint=None):
+        """Busca e processa os quatro recursos de um Pokémon, seguindo só as dependências reais."""
+        details = {}
+        if checkpoint: checkpoint(token)
+        pokemon_url = f"{POKEAPI_BASE_URL}/pokemon/{pokemon_name}"
+        pokemon_data = self._timed_stage(timings, 'pokemon', self.fetch_json, pokemon_url, token)
+        details['data'] = pokemon_data
+        self.stats_table.update(pokemon_data)
+
+        if checkpoint: checkpoint(token)
+        # Espécie e encontros só dependem do Pokémon; a cadeia evolutiva depende da espécie.
+        # Os encontros de um Pokémon já indexado saem direto do índice, sem requisição.
+        poke_id = pokemon_data['id']
+        species_future = self.detail_executor.submit(self._timed_stage, timings, 'species', self.fetch_json, pokemon_data['species']['url'], token)
+        encounters_future = None
+        if not self.encounter_index.has(poke_id):
+            encounters_future = self.detail_executor.submit(self._timed_stage, timings, 'encounters', self.fetch_json, pokemon_data['location_area_encounters'], token)
+
+        species_data = species_future.result()
+        details['flavor_text'] = parse_flavor_text(species_data)
+        details['pt_name'] = parse_pokemon_name(species_data, pokemon_name)
+
+        if checkpoint: checkpoint(token)
+        # A cadeia é compartilhada pela família inteira: só a primeira espécie de cada uma precisa baixá-la.
+        chain_id = resource_id(species_data['evolution_chain']['url'])
+        if not self.evolution_graph.has_chain(chain_id):
+            evolution_data = self._timed_stage(timings, 'evolution', self.fetch_json, species_data['evolution_chain']['url'], token)
+            self.evolution_graph.add_chain(chain_id, evolution_data['chain'])
+        details['evolution_chain'] = self.evolution_graph.family(species_data['id'])
+        details['evolution_stages'] = self.evolution_graph.stages(species_data['id'])
+
+        if encounters_future: self.encounter_index.add(poke_id, encounters_future.result())
+        details['locations'] = self.encounter_index.locations(poke_id)
+        return details
+
+    def _begin_foreground(self):
+        with self._foreground_lock:
+            self._foreground_count += 1
+            self.foreground_idle.clear()
+
+    def _end_foreground(self):
+        with self._foreground_lock:
+            self._foreground_count -= 1
+            if self._foreground_count == 0: self.foreground_idle.set()
+
+    def lookup(self, pokemon_name, search_id=None, token=None):
+        """Busca em primeiro plano: cancela o pré-carregamento, mede as etapas e retorna o resultado (None se cancelada)."""
+        token = token or CancelToken()
+        if token.cancelled: return None
+
+        result = {'search_id': search_id, 'status': None, 'data': None, 'locations': None, 'flavor_text': None, 'pt_name': None, 'evolution_chain': None, 'evolution_stages': None, 'timings': {}}
+        timings = result['timings']
+        start = time.perf_counter()
+        # O pré-carregamento anterior fica obsoleto, menos o deste mesmo Pokémon: a busca entra na
+        # execução dele em vez de abortá-la e baixar tudo de novo.
+        self.cancel_prefetch(keep=pokemon_name)
+        self._begin_foreground()
+        try:
+            result.update(self.get_details(pokemon_name, timings, token))
+            # A execução compartilhada pode ter terminado por causa de outra busca depois que esta foi cancelada.
+            token.raise_if_cancelled()
+            result['status'] = 'success'
+        except OperationCancelled:
+            return None
+        except requests.exceptions.RequestException:
+            result['status'] = 'error'
+        finally:
+            self._end_foreground()
+        end = time.perf_counter()
+        for stage, (stage_start, stage_end) in list(timings.items()):
+            self.perf.record(stage, stage_start, stage_end, search_id, pokemon=pokemon_name)
+        self.perf.record('details', start, end, search_id, pokemon=pokemon_name, status=result['status'])
+        self._report_slow_stage(pokemon_name, timings, end - start)
+        return result
+
+    def batch_lookup(self, queries, max_workers=BATCH_WORKERS):
+        """Resolve muitos Pokémon (nomes ou ids) em paralelo e produz um resumo por consulta assim que fica pronto.
+
+        No máximo max_workers buscas rodam ao mesmo tempo. Consultas repetidas compartilham uma única busca;
+        espécies e cadeias evolutivas em comum já são unificadas pelo single-flight e pelos caches.
+        """
+        token = CancelToken()
+        queries = iter(queries)
+        pending = {}
+        waiting = defaultdict(list)
+        exhausted = False
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pokedex-batch")
+        try:
+            while True:
+                # A fila de entrada é consumida aos poucos, para listas enormes não ocuparem memória de uma vez.
+                while not exhausted and len(pending) < max_workers * 2:
+                    query = next(queries, None)
+                    if query is None:
+                        exhausted = True
+                        break
+                    query = str(query).strip()
+                    if not query: continue
+                    key = self._batch_key(query)
+                    if key not in waiting:
+                        pending[executor.submit(self._batch_resolve, key, token)] = key
+                    waiting[key].append(query)
+                if not pending: break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    record = future.result()
+                    for query in waiting.pop(key):
+                        yield {'query': query, **record}
+        finally:
+            # Se quem consome parar no meio, as buscas da fila são descartadas e as em andamento abortadas no próximo
+            # ponto de checagem. Uma requisição esperando os cabeçalhos não pode ser interrompida (ver HttpClient.get),
+            # então o fechamento não espera as threads: elas terminam essa ida e volta em segundo plano.
+            token.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _batch_key(self, query):
+        key = query.lower().replace(' ', '-')
+        if key.isdigit() and self.index:
+            entry = self.index.lookup_id(key)
+            if entry: return entry['name']
+        return key
+
+    def _batch_resolve(self, key, token):
+        try:
+            return summarize_details(self.get_details(key, None, token))
+        except requests.HTTPError as e:
+            not_found = e.response is not None and e.response.status_code == 404
+            return {'status': 'not_found' if not_found else 'error', 'error': str(e)}
+        except (requests.RequestException, ValueError, KeyError) as e:
+            return {'status': 'error', 'error': str(e)}
+
+    def prepare_image(self, source, artwork_box, scaling, token=None):
+        """Gera as imagens já no tamanho final em pixels; a interface só precisa exibi-las."""
+        if source['type'] == 'gif':
+            animation = self.animation_cache.get(source['url'], scaling, token)
+            # Só o primeiro quadro é necessário para exibir; o resto é decodificado depois da entrega.
+            if not animation.frames and not animation.decode_next():
+                raise ValueError("GIF sem quadros")
+            return {'type': 'gif', 'animation': animation}
+        if source['type'] == 'artwork':
+            # A caixa já vem em pixels reais (winfo), então a artwork ocupa 90% do espaço em qualquer escala.
+            image = self.image_cache.get(source['url'], artwork_box, token=token)
+        else:
+            image = self.image_cache.get(source['url'], scale=SPRITE_SCALE * scaling, token=token)
+        return {'type': source['type'], 'image': image, 'display_size': (image.width / scaling, image.height / scaling)}
+
+    def load_detail_image(self, sources, artwork_box, scaling, token=None, search_id=None, on_ready=None):
+        """Prepara a primeira fonte de imagem disponível e a entrega a on_ready assim que ela pode ser exibida.
+
+        Em GIFs, os quadros restantes são decodificados depois da entrega. Retorna None se nenhuma fonte
+        serviu ou se o token foi cancelado.
+        """
+        token = token or CancelToken()
+        self._begin_foreground()
+        try:
+            for source in sources:
+                token.raise_if_cancelled()
+                try:
+                    with self.perf.span('image_decode', search_id, source=source['type']):
+                        prepared = self.prepare_image(source, artwork_box, scaling, token)
+                except (requests.RequestException, OSError, ValueError) as e:
+                    print(f"Falha ao carregar {source['type']} de {source['url']}: {e}. Tentando próximo...")
+                    continue
+                token.raise_if_cancelled()
+                if on_ready: on_ready(prepared)
+                if prepared['type'] == 'gif':
+                    animation = prepared['animation']
+                    while not token.cancelled and animation.decode_next(): pass
+                return prepared
+            return None
+        except OperationCancelled:
+            return None
+        finally:
+            self._end_foreground()
+
+    def schedule_prefetch(self, pokedex_id, evolution_chain, current_name, artwork_box, scaling):
+        """Agenda, em baixa prioridade, o aquecimento dos caches dos vizinhos e da família evolutiva."""
+        self.cancel_prefetch()
+        candidates = []
+        for distance in range(1, PREFETCH_RADIUS + 1):
+            for neighbour_id in (pokedex_id + distance, pokedex_id - distance):
+                if 0 < neighbour_id <= len(self.catalog):
+                    candidates.append((distance, self.catalog[neighbour_id - 1]['name']))
+        candidates.extend((1, member['name']) for member in evolution_chain)
+
+        seen = {current_name}
+        scheduled = 0
+        for priority, name in sorted(candidates, key=lambda candidate: candidate[0]):
+            if name in seen or scheduled >= PREFETCH_BUDGET: continue
+            seen.add(name)
+            scheduled += 1
+            token = CancelToken()
+            with self._foreground_lock:
+                self.prefetch_tokens[name] = token
+            self.prefetch_pool.submit(priority, self._prefetch_pokemon, name, token, artwork_box, scaling,
+                                      is_stale=lambda token=token: token.cancelled)
+
+    def cancel_prefetch(self, keep=None):
+        """Cancela o pré-carregamento em andamento (inclusive downloads), menos o de keep, que uma busca do usuário vai aproveitar."""
+        with self._foreground_lock:
+            kept = self.prefetch_tokens.pop(keep, None)
+            for token in self.prefetch_tokens.values():
+                token.cancel()
+            self.prefetch_tokens = {keep: kept} if kept else {}
+
+    def _prefetch_checkpoint(self, token):
+        """Cede a vez às buscas do usuário e aborta se o pré-carregamento ficou obsoleto.
+
+        Se uma busca do usuário entrou na mesma execução compartilhada, segue sem esperar: é ela quem aguarda o resultado.
+        """
+        while True:
+            token.raise_if_cancelled()
+            if isinstance(token, FlightToken) and token.waiters > 1: return
+            if self.foreground_idle.wait(PREFETCH_IDLE_WAIT): return
+
+    def _prefetch_pokemon(self, name, token, artwork_box, scaling):
+        checkpoint = partial(self._prefetch_checkpoint, token)
+        try:
+            details = self.get_details(name, {}, token, self._prefetch_checkpoint)
+            checkpoint()
+            sources = image_sources(details['data'].get('sprites', {}))
+            if sources:
+                source = sources[0]
+                if source['type'] == 'gif':
+                    animation = self.animation_cache.get(source['url'], scaling, token)
+                    if not animation.frames: animation.decode_next()
+                elif source['type'] == 'artwork':
+                    self.image_cache.get(source['url'], artwork_box, token=token)
+                else:
+                    self.image_cache.get(source['url'], scale=SPRITE_SCALE * scaling, token=token)
+            for member in details['evolution_chain']:
+                checkpoint()
+                self.image_cache.get(grid_sprite_url(member['id']), token=token)
+        except OperationCancelled:
+            pass
+        except (requests.RequestException, OSError, ValueError, KeyError) as e:
+            print(f"Pré-carregamento de '{name}' falhou: {e}")
+
+    def sync_offline(self, progress=None, stop_event=None):
+        """Espelha o catálogo inteiro no armazenamento offline; retorna os nomes que falharam."""
+        failed = OfflineSync(self.http, self.offline_store, stop_event=stop_event).run(progress)
+        self.index_offline_store()
+        return failed
+
+    def cache_stats(self):
+        """Taxas de acerto dos caches e chamadas poupadas pela unificação de buscas."""
+        images = self.image_cache.stats()
+        return {
+            'api': {'hits': self.api_cache.hits, 'misses': self.api_cache.misses, 'hit_rate': hit_rate(self.api_cache.hits, self.api_cache.misses)},
+            'images': {**images, 'memory_hit_rate': hit_rate(images['memory_hits'], images['memory_misses']),
+                       'disk_hit_rate': hit_rate(images['disk_hits'], images['disk_misses'])},
+            'single_flight': {'saved_calls': self.single_flight.saved_calls, 'saved_by_kind': dict(self.single_flight.saved_by_kind)},
+        }
+
+    def export_metrics(self, path=None):
+        """Grava um trace (Chrome trace JSON) com os intervalos, histogramas e estatísticas de cache."""
+        path = path or os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        return self.perf.export(path, {'caches': self.cache_stats()})
+
+    async def lookup_async(self, pokemon_name, token=None):
+        return await asyncio.to_thread(self.lookup, pokemon_name, None, token)
+
+    async def get_details_async(self, pokemon_name, token=None):
+        return await asyncio.to_thread(self.get_details, pokemon_name, None, token)
+
+    async def fetch_json_async(self, url, token=None):
+        return await asyncio.to_thread(self.fetch_json, url, token)
+
+    async def load_detail_image_async(self, sources, artwork_box, scaling, token=None):
+        return await asyncio.to_thread(self.load_detail_image, sources, artwork_box, scaling, token)